@@ -6,68 +6,173 @@
 # Version: 4.0
 
 import os
+import re
 import sys
-import configparser
+import socket
+import functools
 import subprocess
-from typing import Dict, Set, Tuple, List, Any
+from typing import Dict, FrozenSet, Tuple, List, Any
 
 # Constants
 SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CONFIG_FILE = os.path.join(SCRIPT_DIR, 'config.ini')
 
-# Singleton pattern for config
+# Options that must be present in the [Settings] section
+REQUIRED_SETTINGS = frozenset({
+    'active_zones_file',
+    'remove_zones_file',
+    'log_file',
+    'pdns_api_url',
+    'pdns_api_key',
+    'nameservers',
+    'masterns'
+})
+
+# Singleton pattern for config, reloaded when the file's mtime changes
 _config_instance = None
+_config_mtime = None
+
+# Cached settings dictionary (see get_settings)
+_settings_cache = None
+
+# Matches either a "[section]" header or a "key = value" line. Lines starting
+# with '#' or ';' are comments and blank lines never match.
+_INI_LINE_RE = re.compile(
+    r'^[ \t]*(?:\[([^\]]+)\]|([^#;\s=:][^=:\n]*?)[ \t]*[=:][ \t]*(.*?))[ \t]*$',
+    re.MULTILINE
+)
+
+# Sentinel distinguishing "no fallback given" from a fallback of None
+_UNSET = object()
+
+
+class IniConfig:
+    """
+    Minimal INI file reader for config.ini
+
+    Supports the subset of configparser used by dnssync: flat key = value
+    pairs grouped in sections, with full-line comments. Option names are
+    case-insensitive; there is no interpolation and no multiline values.
+    """
+
+    BOOLEAN_STATES = {
+        '1': True, 'yes': True, 'true': True, 'on': True,
+        '0': False, 'no': False, 'false': False, 'off': False
+    }
+
+    def __init__(self):
+        self._sections: Dict[str, Dict[str, str]] = {}
+
+    def read(self, filename: str) -> None:
+        """Parse an INI file, merging its sections into this config"""
+        with open(filename, 'r') as f:
+            self.read_string(f.read())
+
+    def read_string(self, text: str) -> None:
+        """Parse INI formatted text, merging its sections into this config"""
+        section = None
+        for match in _INI_LINE_RE.finditer(text):
+            header, key, value = match.groups()
+            if header is not None:
+                section = self._sections.setdefault(header.strip(), {})
+            elif section is not None:
+                section[key.lower()] = value
+
+    def sections(self) -> List[str]:
+        """Return the list of section names"""
+        return list(self._sections)
+
+    def has_option(self, section: str, option: str) -> bool:
+        """Check whether an option exists in a section"""
+        return option.lower() in self._sections.get(section, {})
+
+    def get(self, section: str, option: str, fallback: Any = _UNSET) -> Any:
+        """
+        Get an option value as a string
+
+        Raises:
+            KeyError: If the option is missing and no fallback was given
+        """
+        try:
+            return self._sections[section][option.lower()]
+        except KeyError:
+            if fallback is _UNSET:
+                raise KeyError(f"No option '{option}' in section '{section}'")
+            return fallback
+
+    def getint(self, section: str, option: str, fallback: Any = _UNSET) -> Any:
+        """Get an option value converted to an integer"""
+        value = self.get(section, option, fallback=_UNSET if fallback is _UNSET else None)
+        if value is None:
+            return fallback
+        return int(value)
+
+    def getboolean(self, section: str, option: str, fallback: Any = _UNSET) -> Any:
+        """Get an option value converted to a boolean"""
+        value = self.get(section, option, fallback=_UNSET if fallback is _UNSET else None)
+        if value is None:
+            return fallback
+        try:
+            return self.BOOLEAN_STATES[value.lower()]
+        except KeyError:
+            raise ValueError(f"Not a boolean: {value}")
+
+    def __getitem__(self, section: str) -> Dict[str, str]:
+        return self._sections[section]
+
+    def __contains__(self, section: str) -> bool:
+        return section in self._sections
 
 
 def get_config():
     """
     Load configuration from config.ini file
 
+    The parsed file is cached and only re-read when its modification time
+    changes; a reload also invalidates the cached settings.
+
     Returns:
-        configparser.ConfigParser: Configuration object
+        IniConfig: Configuration object
     """
-    global _config_instance
+    global _config_instance, _config_mtime
+
+    try:
+        mtime = os.stat(CONFIG_FILE).st_mtime
+    except FileNotFoundError:
+        # Create default config file if it doesn't exist
+        create_default_config()
+        mtime = os.stat(CONFIG_FILE).st_mtime
+
+    if _config_instance is None or mtime != _config_mtime:
+        reloading = _config_instance is not None
 
-    if _config_instance is None:
         # Load configuration
-        _config_instance = configparser.ConfigParser()
-        
-        if not os.path.exists(CONFIG_FILE):
-            # Create default config file if it doesn't exist
-            create_default_config()
-        
-        _config_instance.read(CONFIG_FILE)
+        config = IniConfig()
+        config.read(CONFIG_FILE)
 
         # Validate required settings
-        required_settings = [
-            'active_zones_file',
-            'remove_zones_file',
-            'log_file',
-            'pdns_api_url',
-            'pdns_api_key',
-            'nameservers',
-            'masterns'
-        ]
-
-        missing_settings = []
-        for setting in required_settings:
-            if not _config_instance.has_option('Settings', setting):
-                missing_settings.append(setting)
+        present = config['Settings'].keys() if 'Settings' in config else ()
+        missing_settings = REQUIRED_SETTINGS.difference(present)
 
         if missing_settings:
-            missing_str = ', '.join(missing_settings)
+            missing_str = ', '.join(sorted(missing_settings))
             sys.stderr.write(
                 f"Missing required configuration options: {missing_str}\n")
             sys.stderr.write("Please check your config.ini file\n")
             sys.exit(1)
 
+        _config_instance = config
+        _config_mtime = mtime
+
+        if reloading:
+            invalidate_settings()
+
     return _config_instance
 
 
 def create_default_config():
     """Create a default configuration file if none exists"""
-    config = configparser.ConfigParser()
-    config['Settings'] = {
+    settings = {
         'active_zones_file': os.path.join(SCRIPT_DIR, 'active_zones.txt'),
         'remove_zones_file': os.path.join(SCRIPT_DIR, 'remove_zones.txt'),
         'log_file': os.path.join(SCRIPT_DIR, 'dnssync.log'),
@@ -81,26 +186,66 @@ def create_default_config():
     }
     
     with open(CONFIG_FILE, 'w') as f:
-        config.write(f)
+        f.write("[Settings]\n")
+        for key, value in settings.items():
+            f.write(f"{key} = {value}\n")
+        f.write("\n")
 
 
-def get_server_ip():
-    """Get the primary server IP address"""
-    return subprocess.getoutput('hostname -I').strip().split()[0]
+@functools.lru_cache(maxsize=1)
+def get_server_ip() -> str:
+    """
+    Get the primary server IP address
+
+    Loopback addresses are never returned, as with 'hostname -I'. If the
+    hostname doesn't resolve to a usable address, the source address of the
+    default route is used, then 'hostname -I' itself.
+    """
+    try:
+        addresses = socket.gethostbyname_ex(socket.gethostname())[2]
+    except OSError:
+        addresses = []
+    for address in addresses:
+        if not address.startswith('127.'):
+            return address
+    
+    # Connecting a UDP socket sends nothing; it only selects the source
+    # address the kernel would route through
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.connect(('192.0.2.1', 9))
+            address = sock.getsockname()[0]
+        if not address.startswith(('127.', '0.')):
+            return address
+    except OSError:
+        pass
+    
+    addresses = subprocess.getoutput('hostname -I').split()
+    return addresses[0] if addresses else ''
+
 
+@functools.lru_cache(maxsize=1)
+def get_fqdn() -> str:
+    """Get the fully qualified hostname of this server"""
+    return socket.getfqdn()
 
-def parse_nameservers() -> Tuple[List[str], List[str]]:
+
+@functools.lru_cache(maxsize=1)
+def parse_nameservers() -> Tuple[FrozenSet[str], FrozenSet[str]]:
     """
     Parse nameserver configuration from config.ini
 
+    The result is cached; nameservers do not change within a run. Callers
+    that need a stable order (e.g. for API payloads) should sort it.
+
     Returns:
-        tuple: Contains primary_ns and secondary_ns lists of sorted nameservers
+        tuple: Contains primary_ns and secondary_ns frozensets of nameservers
     """
     config = get_config()
 
     # Parse primary nameservers
     primary_ns_str = config.get('Settings', 'nameservers')
-    primary_ns = sorted(
+    primary_ns = frozenset(
         ns.strip().lower().rstrip('.') for ns in primary_ns_str.split(',')
     )
 
@@ -109,29 +254,40 @@ def parse_nameservers() -> Tuple[List[str], List[str]]:
                          'ns3.servercentralen.net,ns4.servercentralen.net')
     secondary_ns_str = config.get(
         'Settings', 'secondary_nameservers', fallback=default_secondary)
-    secondary_ns = sorted([
+    secondary_ns = frozenset(
         ns.strip().lower() for ns in secondary_ns_str.split(',') if ns.strip()
-    ])
+    )
 
     return primary_ns, secondary_ns
 
 
-def get_excluded_domains() -> Set[str]:
-    """Get domains excluded from synchronization"""
+@functools.lru_cache(maxsize=1)
+def get_excluded_domains() -> FrozenSet[str]:
+    """Get domains excluded from synchronization (cached)"""
     config = get_config()
     excluded_str = config.get('Settings', 'excluded_domains', fallback='')
-    return {d.strip().lower() for d in excluded_str.split(',') if d.strip()}
+    return frozenset(
+        d.strip().lower() for d in excluded_str.split(',') if d.strip())
 
 
 def get_settings() -> Dict[str, Any]:
     """
     Get all configuration settings as a dictionary
 
+    The settings are cached and rebuilt when config.ini's modification
+    time changes; use invalidate_settings() to force a rebuild.
+
     Returns:
         dict: Configuration settings with defaults applied
     """
+    global _settings_cache
+
+    # Checks config.ini's mtime and invalidates the settings if it changed
     config = get_config()
 
+    if _settings_cache is not None:
+        return _settings_cache
+
     # Get filesystem paths
     active_zones_file = config.get('Settings', 'active_zones_file')
     remove_zones_file = config.get('Settings', 'remove_zones_file')
@@ -151,9 +307,8 @@ def get_settings() -> Dict[str, Any]:
     excluded_domains = get_excluded_domains()
 
     # Get cPanel hostname
-    hostname_cmd = subprocess.getoutput('hostname -f').strip()
     cpanel_hostname = config.get('Settings', 'cpanel_hostname',
-                                 fallback=hostname_cmd)
+                                 fallback=None) or get_fqdn()
 
     # Get sync settings
     enable_bidirectional = config.getboolean(
@@ -161,7 +316,7 @@ def get_settings() -> Dict[str, Any]:
     max_soa_drift = config.getint(
         'Settings', 'max_soa_drift', fallback=5)
 
-    return {
+    _settings_cache = {
         'active_zones_file': active_zones_file,
         'remove_zones_file': remove_zones_file,
         'orphans_file': orphans_file,
@@ -178,6 +333,16 @@ def get_settings() -> Dict[str, Any]:
         'server_ip': get_server_ip()
     }
 
+    return _settings_cache
+
+
+def invalidate_settings() -> None:
+    """Discard cached settings so the next get_settings() call rebuilds them"""
+    global _settings_cache
+    _settings_cache = None
+    parse_nameservers.cache_clear()
+    get_excluded_domains.cache_clear()
+
 
 # Function to validate command-line arguments
 def validate_arguments(args):
@@ -185,32 +350,26 @@ def validate_arguments(args):
     Validate command-line arguments for conflicts and incompatible options
 
     Args:
-        args: The parsed command-line arguments
+        args: The parsed command-line arguments (as returned by
+            utils.parse_arguments, which defines every option checked here)
 
     Raises:
         ValueError: If conflicting or incompatible arguments are detected
     """
     # Check that write and dryrun are not used together
-    if getattr(args, 'write', False) and getattr(args, 'dryrun', False):
+    if args.write and args.dryrun:
         raise ValueError("Error: --write and --dryrun cannot be used together")
 
     # Check that stepbystep is only used with domain
-    if (getattr(args, 'stepbystep', False) and
-            not getattr(args, 'domain', None)):
+    if args.stepbystep and not args.domain:
         raise ValueError("Error: --stepbystep can only be used with --domain")
 
     # Check that disable_bidirectional is not used with cleanup
-    if (getattr(args, 'disable_bidirectional', False) and
-            getattr(args, 'cleanup', False)):
+    if args.disable_bidirectional and args.cleanup:
         raise ValueError(
             "Error: --disable_bidirectional cannot be used with --cleanup")
             
     # Ensure only one operation mode is specified
-    modes = [
-        getattr(args, 'domain', None),
-        getattr(args, 'cleanup', False),
-        getattr(args, 'orphans', False)
-    ]
-    if sum(1 for mode in modes if mode) > 1:
+    if bool(args.domain) + bool(args.cleanup) + bool(args.orphans) > 1:
         raise ValueError(
             "Error: Only one of --domain, --cleanup, or --orphans may be specified")
\ No newline at end of file
@@ -7,19 +7,30 @@
 
 import sys
 import logging
-import traceback
-from datetime import datetime
 from abc import ABC, abstractmethod
-from typing import Dict, Set, Tuple, List, Any, Optional
+from typing import Dict, Set, Tuple, List, Any, Optional, NamedTuple, Iterable
 import time
 
-# Import local modules
+# Import local modules. Heavier modules (database, delegation, zones) are
+# imported where they are used so short CLI paths don't pay for them.
 from .locks import single_instance, release_lock
 from .logger import setup_logging
 from .utils import parse_arguments
 from .config import get_settings
-from .db_manager import DatabaseManager
-from .error_handling import CircuitBreaker, retry_with_backoff
+# Needed at class definition time for the adapter method decorators
+from .error_handling import retry_with_backoff
+
+# Singleton adapter instances (see get_dns_api / get_domain_manager)
+_dns_api_instance = None
+_domain_manager_instance = None
+
+
+class DomainDeltas(NamedTuple):
+    """Differences between cPanel's affiliated domains and tracked domains"""
+    affiliated: Set[str]
+    new_domains: Set[str]
+    removed: Set[str]
+
 
 class DnsApiInterface(ABC):
     """Interface for DNS API operations"""
@@ -53,6 +64,11 @@ class DomainManagerInterface(ABC):
         """Get set of all affiliated domains"""
         pass
 
+    @abstractmethod
+    def compute_domain_deltas(self, statuses: Dict[str, str]) -> DomainDeltas:
+        """Compare affiliated domains against the active domains in statuses"""
+        pass
+
     @abstractmethod
     def process_queue(self, max_domains: int, distribution: Tuple[int, int, int], dryrun: bool) -> Dict[str, Any]:
         """Process domain queue with specified distribution"""
@@ -63,11 +79,26 @@ class DomainManagerInterface(ABC):
         """Load domain tracking data"""
         pass
 
+    @abstractmethod
+    def load_statuses(self) -> Dict[str, str]:
+        """Load the status of every tracked domain"""
+        pass
+
     @abstractmethod
     def save_tracking(self, tracking: Dict[str, Dict[str, Any]]) -> bool:
         """Save domain tracking data"""
         pass
     
+    @abstractmethod
+    def upsert_domain(self, domain: str, status: str, timestamp: Optional[int] = None) -> bool:
+        """Insert or update tracking data for a single domain"""
+        pass
+    
+    @abstractmethod
+    def update_statuses(self, updates: Iterable[Tuple[str, str]], timestamp: Optional[int] = None) -> bool:
+        """Insert or update the status of several domains at once"""
+        pass
+    
     @abstractmethod
     def get_domains_by_status(self, status: str) -> List[str]:
         """Get domains with a specified status"""
@@ -83,7 +114,7 @@ class PowerDnsApiAdapter(DnsApiInterface):
     """Adapter for PowerDNS API operations with circuit breaker and retry logic"""
     
     def __init__(self):
-        from .config import get_settings
+        from .error_handling import CircuitBreaker
         self.settings = get_settings()
         # Initialize circuit breaker for API calls
         self.circuit_breaker = CircuitBreaker(
@@ -139,7 +170,8 @@ class DomainManagerAdapter(DomainManagerInterface):
     """Adapter for domain management operations using database storage"""
     
     def __init__(self):
-        self.db_manager = DatabaseManager()
+        from .db_manager import get_db
+        self.db_manager = get_db()
         # Import here to avoid circular imports
         from .domains import (
             get_affiliated_domains as get_domains, 
@@ -158,6 +190,36 @@ class DomainManagerAdapter(DomainManagerInterface):
         """Get affiliated domains using the domain module function"""
         return self.get_domains()
 
+    def compute_domain_deltas(self, statuses: Dict[str, str]) -> DomainDeltas:
+        """
+        Fetch affiliated domains once and diff them against tracked statuses
+
+        The active set is derived from the already loaded statuses, so no
+        separate active-zones query is needed.
+        """
+        affiliated = self.get_domains()
+
+        # Affiliated domains that are not tracked as active
+        new_domains = set()
+        add_new = new_domains.add
+        for domain in affiliated:
+            if statuses.get(domain) != 'active':
+                add_new(domain)
+
+        # Active domains no longer affiliated, filtered in a single pass
+        # without materializing the full active set
+        removed = set()
+        add_removed = removed.add
+        for domain, status in statuses.items():
+            if status == 'active' and domain not in affiliated:
+                add_removed(domain)
+
+        return DomainDeltas(
+            affiliated=affiliated,
+            new_domains=new_domains,
+            removed=removed
+        )
+
     def process_queue(self, max_domains: int, distribution: Tuple[int, int, int], dryrun: bool) -> Dict[str, Any]:
         """Process domain queue using the domain module function"""
         return self.process_queue_func(max_domains, distribution, dryrun)
@@ -166,10 +228,22 @@ class DomainManagerAdapter(DomainManagerInterface):
         """Load domain tracking data from database"""
         return self.db_manager.load_domain_tracking()
 
+    def load_statuses(self) -> Dict[str, str]:
+        """Load domain -> status from database, without timestamps or metadata"""
+        return self.db_manager.load_domain_statuses()
+
     def save_tracking(self, tracking: Dict[str, Dict[str, Any]]) -> bool:
         """Save domain tracking data to database"""
         return self.db_manager.save_domain_tracking(tracking)
     
+    def upsert_domain(self, domain: str, status: str, timestamp: Optional[int] = None) -> bool:
+        """Insert or update a single domain's tracking row in the database"""
+        return self.db_manager.upsert_domain(domain, status, timestamp)
+    
+    def update_statuses(self, updates: Iterable[Tuple[str, str]], timestamp: Optional[int] = None) -> bool:
+        """Insert or update several domains' statuses in one database transaction"""
+        return self.db_manager.update_domain_statuses(updates, timestamp)
+    
     def get_domains_by_status(self, status: str) -> List[str]:
         """Get domains with a specified status from database"""
         return self.db_manager.get_domains_by_status(status)
@@ -180,6 +254,36 @@ class DomainManagerAdapter(DomainManagerInterface):
         handle_zones(dryrun)
 
 
+def get_dns_api() -> DnsApiInterface:
+    """
+    Get the shared DNS API adapter
+
+    Returns:
+        DnsApiInterface: PowerDNS adapter, created on first use
+    """
+    global _dns_api_instance
+
+    if _dns_api_instance is None:
+        _dns_api_instance = PowerDnsApiAdapter()
+
+    return _dns_api_instance
+
+
+def get_domain_manager() -> DomainManagerInterface:
+    """
+    Get the shared domain manager adapter
+
+    Returns:
+        DomainManagerInterface: Database-backed domain manager, created on first use
+    """
+    global _domain_manager_instance
+
+    if _domain_manager_instance is None:
+        _domain_manager_instance = DomainManagerAdapter()
+
+    return _domain_manager_instance
+
+
 def main():
     """Main function to run the DNS synchronization process with injected dependencies"""
     # Parse command-line arguments
@@ -188,16 +292,17 @@ def main():
     # Set up logging
     setup_logging(args.silent, args.log)
     
-    # Instantiate adapters
-    dns_api = PowerDnsApiAdapter()
-    domain_manager = DomainManagerAdapter()
-    
-    # Ensure only one instance is running
+    # Ensure only one instance is running before doing any real work, so a
+    # losing concurrent invocation exits without loading settings or the DB
     lock_file = single_instance()
     
     # Get settings
     settings = get_settings()
     
+    # Get adapters
+    dns_api = get_dns_api()
+    domain_manager = get_domain_manager()
+    
     # Inform about dry-run or write mode
     if args.dryrun:
         logging.info("=" * 80)
@@ -228,8 +333,7 @@ def main():
         logging.info("Script completed successfully.")
     
     except Exception as e:
-        logging.error(f"Error during execution: {str(e)}")
-        logging.error(traceback.format_exc())
+        logging.error(f"Error during execution: {str(e)}", exc_info=True)
         sys.exit(1)
     finally:
         release_lock()
@@ -240,17 +344,17 @@ def _process_single_domain(args, dns_api, domain_manager, settings):
     from .delegation import check_authoritative_ns
     from .zones import check_zone_sync, fix_soa_drift
     
-    logging.info(f"Processing single domain: {args.domain}")
-    excluded_domains = settings['excluded_domains']
-    if args.domain in excluded_domains:
-        logging.info(f"{args.domain} explicitly excluded.")
+    logging.info("Processing single domain: %s", args.domain)
+    # excluded_domains is a frozenset of lowercased names
+    if args.domain.lower().rstrip('.') in settings['excluded_domains']:
+        logging.info("%s explicitly excluded.", args.domain)
         sys.exit(0)
     
     ns_result = check_authoritative_ns(args.domain)
     if not ns_result['verified']:
-        logging.error(f"{args.domain} does not have correct NS records or delegation.")
+        logging.error("%s does not have correct NS records or delegation.", args.domain)
         for error in ns_result.get('errors', []):
-            logging.error(f"- {error}")
+            logging.error("- %s", error)
         sys.exit(1)
     
     try:
@@ -267,9 +371,9 @@ def _process_single_domain(args, dns_api, domain_manager, settings):
                     
             sync_status = check_zone_sync(args.domain)
             if sync_status['sync_status'] != 'success':
-                logging.warning(f"Sync issues detected for {args.domain}: {sync_status['error_message']}")
+                logging.warning("Sync issues detected for %s: %s", args.domain, sync_status['error_message'])
                 if sync_status['soa_drift'] and sync_status['soa_drift'] > settings['max_soa_drift']:
-                    logging.error(f"Critical SOA drift detected: {sync_status['soa_drift']}")
+                    logging.error("Critical SOA drift detected: %s", sync_status['soa_drift'])
                     if args.stepbystep:
                         proceed = input(f"Attempt to fix SOA drift for {args.domain}? (y/n): ").strip().lower() == 'y'
                         if not proceed:
@@ -281,21 +385,16 @@ def _process_single_domain(args, dns_api, domain_manager, settings):
                         args.dryrun
                     )
                     if success:
-                        logging.info(f"SOA drift correction: {message}")
+                        logging.info("SOA drift correction: %s", message)
                     else:
-                        logging.error(f"Failed to fix SOA drift: {message}")
+                        logging.error("Failed to fix SOA drift: %s", message)
             else:
-                logging.info(f"Zone {args.domain} is in sync!")
+                logging.info("Zone %s is in sync!", args.domain)
             
-            tracking = domain_manager.load_tracking()
-            tracking[args.domain] = {
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "status": "active"
-            }
-            domain_manager.save_tracking(tracking)
+            domain_manager.upsert_domain(args.domain, "active", int(time.time()))
             
     except Exception as e:
-        logging.error(f"Error processing domain {args.domain}: {str(e)}")
+        logging.error("Error processing domain %s: %s", args.domain, e)
         sys.exit(1)
 
 
@@ -304,58 +403,49 @@ def _process_orphaned_domains(args, domain_manager):
     from .delegation import check_authoritative_ns
     
     logging.info("Processing orphaned domains")
-    tracking = domain_manager.load_tracking()
     orphan_domains = domain_manager.get_domains_by_status("orphan")
     
     if orphan_domains:
-        logging.info(f"Found {len(orphan_domains)} orphaned domains")
+        logging.info("Found %d orphaned domains", len(orphan_domains))
+        reactivated = []
         for domain in orphan_domains:
-            logging.info(f"Checking orphaned domain: {domain}")
+            logging.info("Checking orphaned domain: %s", domain)
             ns_result = check_authoritative_ns(domain)
             if ns_result['verified']:
-                logging.info(f"Orphaned domain {domain} now resolves correctly, marking as active")
-                tracking[domain]['status'] = 'active'
-                tracking[domain]['timestamp'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                logging.info("Orphaned domain %s now resolves correctly, marking as active", domain)
+                reactivated.append((domain, 'active'))
             elif ns_result.get('errors'):
-                logging.info(f"Orphaned domain {domain} still has delegation issues:")
+                logging.info("Orphaned domain %s still has delegation issues:", domain)
                 for error in ns_result.get('errors', []):
-                    logging.info(f"- {error}")
-        domain_manager.save_tracking(tracking)
+                    logging.info("- %s", error)
+        if reactivated:
+            domain_manager.update_statuses(reactivated, int(time.time()))
     else:
         logging.info("No orphaned domains found")
 
 
 def _process_bulk_domains(args, dns_api, domain_manager):
     """Process all affiliated domains in bulk mode"""
-    from .domains import load_active_zones
     
     # Bulk processing of affiliated domains
-    affiliated = domain_manager.get_affiliated_domains()
-    logging.info(f"Found {len(affiliated)} affiliated domains in cPanel")
-    active_tracking = load_active_zones()
-    new_domains = affiliated - active_tracking
+    statuses = domain_manager.load_statuses()
+    affiliated, new_domains, removed = domain_manager.compute_domain_deltas(statuses)
+    logging.info("Found %d affiliated domains in cPanel", len(affiliated))
     if new_domains:
-        logging.info(f"Found {len(new_domains)} new domains to process")
-    
-    tracking = domain_manager.load_tracking()
+        logging.info("Found %d new domains to process", len(new_domains))
     
-    # Mark new domains as active
-    for domain in affiliated:
-        if domain not in tracking:
-            tracking[domain] = {
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "status": "active"
-            }
+    # Mark new domains as active and removed domains as inactive, in one
+    # transaction with one timestamp for the whole batch
+    updates = [(domain, "active") for domain in affiliated if domain not in statuses]
     
-    # Mark removed domains as inactive
-    removed = {domain for domain, info in tracking.items() 
-              if info['status'] == 'active'} - affiliated
     if removed:
-        logging.info(f"Found {len(removed)} domains removed from cPanel")
+        logging.info("Found %d domains removed from cPanel", len(removed))
         for domain in removed:
-            tracking[domain]["status"] = "inactive"
-            tracking[domain]["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            logging.info(f"Marked {domain} as inactive")
+            updates.append((domain, "inactive"))
+            logging.info("Marked %s as inactive", domain)
+    
+    if updates:
+        domain_manager.update_statuses(updates, int(time.time()))
     
     # Process domain queue
     results = domain_manager.process_queue(
@@ -364,9 +454,6 @@ def _process_bulk_domains(args, dns_api, domain_manager):
         dryrun=args.dryrun
     )
     
-    # Save updated tracking data
-    domain_manager.save_tracking(tracking)
-    
     # Handle removed zones
     domain_manager.handle_removed_zones(args.dryrun)
 
@@ -6,11 +6,78 @@
 # Version: 1.0
 
 import os
+import time
 import sqlite3
 import logging
 import json
-from datetime import datetime
-from typing import Dict, Any, List, Optional
+from itertools import islice
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Tuple
+
+from .utils import json_loads, json_dumps
+from .error_handling import retry_with_backoff
+
+# Connection tuning applied to every new connection. WAL lets readers
+# proceed during writes and, with synchronous=NORMAL, avoids an fsync on
+# every commit.
+_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536",
+)
+
+# Retry transient errors such as a locked or busy database. These are
+# sqlite3.OperationalError; only corruption (see _is_corruption) triggers
+# a rebuild.
+_retry_transient = retry_with_backoff(max_retries=3, exceptions=(sqlite3.OperationalError,))
+
+# Primary SQLite result codes meaning the database file itself is unusable
+_CORRUPTION_CODES = frozenset({
+    11,  # SQLITE_CORRUPT
+    26,  # SQLITE_NOTADB
+})
+
+# Shared instance (see get_db)
+_db_instance = None
+
+# Format of timestamps stored as text by earlier versions
+LEGACY_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def timestamp_from_text(value: Any) -> int:
+    """
+    Convert a legacy "%Y-%m-%d %H:%M:%S" local-time string to epoch seconds
+
+    Integers and numeric strings (including fractional epochs) are passed
+    through. Unparseable values map to the current time, so they are never
+    mistaken for long-expired entries.
+    """
+    if isinstance(value, int):
+        return value
+    try:
+        return int(float(value))
+    except (TypeError, ValueError, OverflowError):
+        pass
+    try:
+        return int(time.mktime(time.strptime(value, LEGACY_TIMESTAMP_FORMAT)))
+    except (TypeError, ValueError, OverflowError):
+        return int(time.time())
+
+
+def _is_corruption(error: sqlite3.DatabaseError) -> bool:
+    """
+    Tell whether a database error means the file is corrupt
+
+    Subclasses such as IntegrityError, ProgrammingError and InterfaceError
+    report bad input or API misuse, not a damaged file.
+    """
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is None:
+        return type(error) is sqlite3.DatabaseError
+    # Extended result codes carry the primary code in the low byte
+    return (code & 0xff) in _CORRUPTION_CODES
+
 
 class DatabaseManager:
     """Manages SQLite database operations for domain tracking with failsafe recovery"""
@@ -26,28 +93,113 @@ class DatabaseManager:
         self.conn = None
         self.initialize_database()
     
+    def _connect(self) -> None:
+        """Open the connection, apply PRAGMAs and ensure the schema exists"""
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        for pragma in _PRAGMAS:
+            self.conn.execute(pragma)
+        
+        # Create domains table
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS domains (
+                domain TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                timestamp INTEGER NOT NULL,
+                metadata TEXT
+            )
+        ''')
+        self._migrate_text_timestamps()
+        
+        # Serves status lookups and status + age range scans
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_domains_status_timestamp "
+            "ON domains(status, timestamp)"
+        )
+        
+        # Source files already migrated by scripts/migrate_data.py, with the
+        # mtime and size they had at the time
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS migrations_meta (
+                file_path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL
+            )
+        ''')
+    
+    def _migrate_text_timestamps(self) -> None:
+        """
+        Rebuild a table created with TEXT timestamps as INTEGER epoch seconds
+
+        The rebuild runs in one explicit transaction, DDL included, so it
+        either completes or leaves the old table untouched. Rows left in
+        domains_legacy by an interrupted rebuild in an earlier version are
+        merged back, without overwriting rows written since.
+        """
+        columns = {row[1]: row[2] for row in self.conn.execute("PRAGMA table_info(domains)")}
+        text_timestamps = columns.get("timestamp", "").upper() == "TEXT"
+        leftover = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'domains_legacy'"
+        ).fetchone() is not None
+        if not text_timestamps and not leftover:
+            return
+        
+        logging.info("Migrating domain timestamps to epoch seconds")
+        
+        # sqlite3 doesn't open transactions for DDL on its own, so manage
+        # the transaction explicitly while the table is rebuilt
+        isolation_level = self.conn.isolation_level
+        self.conn.isolation_level = None
+        try:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                if text_timestamps:
+                    if leftover:
+                        # Both are legacy data; keep the table being migrated
+                        self.conn.execute("DROP TABLE domains_legacy")
+                    self.conn.execute("DROP INDEX IF EXISTS idx_domains_status_timestamp")
+                    self.conn.execute("ALTER TABLE domains RENAME TO domains_legacy")
+                    self.conn.execute('''
+                        CREATE TABLE domains (
+                            domain TEXT PRIMARY KEY,
+                            status TEXT NOT NULL,
+                            timestamp INTEGER NOT NULL,
+                            metadata TEXT
+                        )
+                    ''')
+                rows = [
+                    (domain, status, timestamp_from_text(timestamp), metadata)
+                    for domain, status, timestamp, metadata in
+                    self.conn.execute("SELECT domain, status, timestamp, metadata FROM domains_legacy")
+                ]
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO domains (domain, status, timestamp, metadata) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                self.conn.execute("DROP TABLE domains_legacy")
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        finally:
+            self.conn.isolation_level = isolation_level
+    
+    @_retry_transient
     def initialize_database(self) -> None:
         """Create tables if they don't exist or recreate if corrupt"""
         try:
-            self.conn = sqlite3.connect(self.db_path)
-            # Enable foreign keys
-            self.conn.execute("PRAGMA foreign_keys = ON")
-            
-            # Create domains table
-            self.conn.execute('''
-                CREATE TABLE IF NOT EXISTS domains (
-                    domain TEXT PRIMARY KEY,
-                    status TEXT NOT NULL,
-                    timestamp TEXT NOT NULL,
-                    metadata TEXT
-                )
-            ''')
+            self._connect()
             
             # Test query to verify database is functional
             self.conn.execute("SELECT COUNT(*) FROM domains")
             self.conn.commit()
             
+        except sqlite3.OperationalError:
+            # Transient; close and let the retry reconnect
+            self.close()
+            raise
         except sqlite3.DatabaseError as e:
+            if not _is_corruption(e):
+                raise
             logging.error(f"Database error: {e}. Recreating database.")
             self._recreate_database()
     
@@ -60,124 +212,233 @@ class DatabaseManager:
             except:
                 pass
         
-        # Remove corrupt database
-        try:
-            if os.path.exists(self.db_path):
-                os.remove(self.db_path)
-                logging.warning(f"Removed corrupt database at {self.db_path}")
-        except Exception as e:
-            logging.error(f"Failed to remove corrupt database: {e}")
+        # Remove corrupt database along with its WAL and shared-memory files
+        for path in (self.db_path, f"{self.db_path}-wal", f"{self.db_path}-shm"):
+            try:
+                os.remove(path)
+                logging.warning(f"Removed corrupt database file {path}")
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logging.error(f"Failed to remove corrupt database file {path}: {e}")
         
         # Create new database
         try:
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.execute("PRAGMA foreign_keys = ON")
-            
-            # Create domains table
-            self.conn.execute('''
-                CREATE TABLE IF NOT EXISTS domains (
-                    domain TEXT PRIMARY KEY,
-                    status TEXT NOT NULL,
-                    timestamp TEXT NOT NULL,
-                    metadata TEXT
-                )
-            ''')
-            
+            self._connect()
             self.conn.commit()
             logging.info("Database recreated successfully")
         except Exception as e:
             logging.critical(f"Failed to recreate database: {e}")
             raise
     
+    @_retry_transient
     def load_domain_tracking(self) -> Dict[str, Dict[str, Any]]:
         """Load domain tracking data from database"""
         tracking = {}
         
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT domain, status, timestamp, metadata FROM domains")
+            cursor = self.conn.execute("SELECT domain, status, timestamp, metadata FROM domains")
             
-            for row in cursor.fetchall():
-                domain, status, timestamp, metadata = row
-                tracking[domain] = {
-                    "status": status,
-                    "timestamp": timestamp
-                }
+            # Iterate the cursor directly rather than materializing fetchall()
+            for domain, status, timestamp, metadata in cursor:
+                entry = {"status": status, "timestamp": timestamp}
                 
-                # Add metadata if it exists
-                if metadata:
+                # Add metadata if it exists (empty dicts are stored as NULL,
+                # but older rows may hold a literal '{}')
+                if metadata and metadata != '{}':
                     try:
-                        metadata_dict = json.loads(metadata)
-                        for key, value in metadata_dict.items():
-                            tracking[domain][key] = value
+                        entry.update(json_loads(metadata))
                     except json.JSONDecodeError:
                         logging.warning(f"Invalid metadata format for domain {domain}")
+                
+                tracking[domain] = entry
             
             return tracking
-        except sqlite3.Error as e:
+        except sqlite3.OperationalError:
+            raise
+        except sqlite3.DatabaseError as e:
+            if not _is_corruption(e):
+                raise
             logging.error(f"Error loading domain tracking: {e}")
             self._recreate_database()
             return {}
     
+    @_retry_transient
+    def load_domain_statuses(self) -> Dict[str, str]:
+        """
+        Load domain -> status for every tracked domain
+
+        A flat mapping of strings instead of a dict per domain, for callers
+        that don't need timestamps or metadata.
+        """
+        try:
+            return dict(self.conn.execute("SELECT domain, status FROM domains"))
+        except sqlite3.OperationalError:
+            raise
+        except sqlite3.DatabaseError as e:
+            if not _is_corruption(e):
+                raise
+            logging.error(f"Error loading domain statuses: {e}")
+            self._recreate_database()
+            return {}
+    
+    @_retry_transient
     def save_domain_tracking(self, tracking: Dict[str, Dict[str, Any]]) -> bool:
-        """Save domain tracking data to database"""
+        """Save domain tracking data to database (timestamps are epoch seconds)"""
+        default_timestamp = int(time.time())
+        rows = []
+        for domain, data in tracking.items():
+            # Extract metadata (any fields besides status and timestamp)
+            metadata = {k: v for k, v in data.items() if k not in ("status", "timestamp")}
+            rows.append((
+                domain,
+                data.get("status", "unknown"),
+                timestamp_from_text(data.get("timestamp", default_timestamp)),
+                json_dumps(metadata) if metadata else None
+            ))
+        
         try:
-            cursor = self.conn.cursor()
-            
-            # Begin transaction
-            self.conn.execute("BEGIN TRANSACTION")
-            
-            for domain, data in tracking.items():
-                # Extract required fields
-                status = data.get("status", "unknown")
-                timestamp = data.get("timestamp", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-                
-                # Extract metadata (any fields besides status and timestamp)
-                metadata = {k: v for k, v in data.items() if k not in ["status", "timestamp"]}
-                metadata_json = json.dumps(metadata) if metadata else None
-                
-                # Upsert domain record
-                cursor.execute(
+            # The connection context manager commits, or rolls back on error
+            with self.conn:
+                self.conn.executemany(
                     """
                     INSERT INTO domains (domain, status, timestamp, metadata)
-                    VALUES (?, ?, ?, ?) 
+                    VALUES (?, ?, ?, ?)
                     ON CONFLICT(domain) DO UPDATE SET
-                        status = ?,
-                        timestamp = ?,
-                        metadata = ?
+                        status = excluded.status,
+                        timestamp = excluded.timestamp,
+                        metadata = excluded.metadata
                     """,
-                    (domain, status, timestamp, metadata_json, status, timestamp, metadata_json)
+                    rows
                 )
-            
-            # Commit transaction
-            self.conn.commit()
             return True
             
-        except sqlite3.Error as e:
+        except sqlite3.OperationalError:
+            raise
+        except sqlite3.DatabaseError as e:
             logging.error(f"Error saving domain tracking: {e}")
-            try:
-                self.conn.rollback()
-            except:
-                pass
-            self._recreate_database()
+            if _is_corruption(e):
+                self._recreate_database()
             return False
     
+    @_retry_transient
     def get_domains_by_status(self, status: str) -> List[str]:
         """Get list of domains with specified status"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT domain FROM domains WHERE status = ?", (status,))
-            return [row[0] for row in cursor.fetchall()]
-        except sqlite3.Error as e:
+            return [
+                row[0] for row in
+                self.conn.execute("SELECT domain FROM domains WHERE status = ?", (status,))
+            ]
+        except sqlite3.OperationalError:
+            raise
+        except sqlite3.DatabaseError as e:
+            if not _is_corruption(e):
+                raise
             logging.error(f"Error getting domains by status: {e}")
             self._recreate_database()
             return []
     
+    def iter_domains_by_statuses(self, statuses: Iterable[str]) -> Iterator[Tuple[str, str, int, Optional[str]]]:
+        """Yield (domain, status, timestamp, metadata) rows with any of the given statuses, oldest first"""
+        statuses = tuple(statuses)
+        placeholders = ", ".join("?" * len(statuses))
+        try:
+            cursor = self.conn.execute(
+                f"SELECT domain, status, timestamp, metadata FROM domains "
+                f"WHERE status IN ({placeholders}) ORDER BY timestamp",
+                statuses
+            )
+            yield from cursor
+        except sqlite3.OperationalError:
+            # Rows may already have been yielded, so this can't be retried here
+            raise
+        except sqlite3.DatabaseError as e:
+            if not _is_corruption(e):
+                raise
+            logging.error(f"Error iterating domains by status: {e}")
+            self._recreate_database()
+    
+    @_retry_transient
+    def get_stale_inactive(self, cutoff: int) -> List[str]:
+        """
+        Get inactive domains whose timestamp is older than cutoff (epoch seconds)
+
+        Rows with a zero timestamp, left by earlier migrations of unparseable
+        values, are never treated as stale.
+        """
+        try:
+            cursor = self.conn.execute(
+                "SELECT domain FROM domains WHERE status = 'inactive' "
+                "AND timestamp > 0 AND timestamp < ?",
+                (cutoff,)
+            )
+            return [row[0] for row in cursor]
+        except sqlite3.OperationalError:
+            raise
+        except sqlite3.DatabaseError as e:
+            if not _is_corruption(e):
+                raise
+            logging.error(f"Error getting stale inactive domains: {e}")
+            self._recreate_database()
+            return []
+    
+    def update_timestamps(self, domains: Iterable[str], timestamp: int) -> bool:
+        """Set the timestamp of existing domains without touching other columns"""
+        try:
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE domains SET timestamp = ? WHERE domain = ?",
+                    [(timestamp, domain) for domain in domains]
+                )
+            return True
+        except sqlite3.Error as e:
+            logging.error(f"Error updating domain timestamps: {e}")
+            return False
+    
+    def delete_domains(self, domains: Iterable[str]) -> bool:
+        """Delete domains from tracking in a single transaction"""
+        try:
+            with self.conn:
+                self.conn.executemany(
+                    "DELETE FROM domains WHERE domain = ?",
+                    [(domain,) for domain in domains]
+                )
+            return True
+        except sqlite3.Error as e:
+            logging.error(f"Error deleting domains: {e}")
+            return False
+    
+    def upsert_domain(self, domain: str, status: str, timestamp: Optional[int] = None) -> bool:
+        """Insert or update the status and timestamp (epoch seconds) of a single domain"""
+        if timestamp is None:
+            timestamp = int(time.time())
+        
+        try:
+            self.conn.execute(
+                """
+                INSERT INTO domains (domain, status, timestamp)
+                VALUES (?, ?, ?)
+                ON CONFLICT(domain) DO UPDATE SET
+                    status = excluded.status,
+                    timestamp = excluded.timestamp
+                """,
+                (domain, status, timestamp)
+            )
+            self.conn.commit()
+            return True
+        except sqlite3.Error as e:
+            logging.error(f"Error upserting domain {domain}: {e}")
+            try:
+                self.conn.rollback()
+            except:
+                pass
+            return False
+    
     def update_domain_status(self, domain: str, status: str) -> bool:
         """Update status for a specific domain"""
         try:
             cursor = self.conn.cursor()
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            timestamp = int(time.time())
             
             cursor.execute(
                 """
@@ -205,10 +466,110 @@ class DatabaseManager:
                 pass
             return False
     
+    def update_domain_statuses(self, updates: Iterable[Tuple[str, str]], timestamp: Optional[int] = None) -> bool:
+        """Insert or update (domain, status) pairs in a single transaction"""
+        if timestamp is None:
+            timestamp = int(time.time())
+        
+        try:
+            with self.conn:
+                self.conn.executemany(
+                    """
+                    INSERT INTO domains (domain, status, timestamp)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT(domain) DO UPDATE SET
+                        status = excluded.status,
+                        timestamp = excluded.timestamp
+                    """,
+                    [(domain, status, timestamp) for domain, status in updates]
+                )
+            return True
+        except sqlite3.Error as e:
+            logging.error(f"Error updating domain statuses: {e}")
+            return False
+
+    def is_migrated(self, file_path: str, mtime_ns: int, size: int) -> bool:
+        """Check whether a source file was migrated when it had this mtime and size"""
+        try:
+            row = self.conn.execute(
+                "SELECT mtime_ns, size FROM migrations_meta WHERE file_path = ?",
+                (file_path,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logging.error(f"Error reading migration metadata: {e}")
+            return False
+        return row == (mtime_ns, size)
+    
+    def upsert_domains(self, rows: Iterable[Tuple[str, str, int]], batch_size: int = 1000,
+                       source: Optional[Tuple[str, int, int]] = None) -> int:
+        """
+        Insert or update (domain, status, timestamp) rows in a single transaction
+
+        Rows are consumed in batches of batch_size, so a generator can be
+        streamed in without materializing it. Domains that already have the
+        given status are left untouched, timestamp included.
+
+        If source is given as (file_path, mtime_ns, size), it is recorded in
+        migrations_meta in the same transaction (see is_migrated).
+
+        Returns:
+            Number of domains inserted or changed
+        """
+        rows = iter(rows)
+        try:
+            changes_before = self.conn.total_changes
+            with self.conn:
+                if source is not None:
+                    self.conn.execute(
+                        """
+                        INSERT INTO migrations_meta (file_path, mtime_ns, size)
+                        VALUES (?, ?, ?)
+                        ON CONFLICT(file_path) DO UPDATE SET
+                            mtime_ns = excluded.mtime_ns,
+                            size = excluded.size
+                        """,
+                        source
+                    )
+                    changes_before = self.conn.total_changes
+                while True:
+                    batch = list(islice(rows, batch_size))
+                    if not batch:
+                        break
+                    self.conn.executemany(
+                        """
+                        INSERT INTO domains (domain, status, timestamp)
+                        VALUES (?, ?, ?)
+                        ON CONFLICT(domain) DO UPDATE SET
+                            status = excluded.status,
+                            timestamp = excluded.timestamp
+                        WHERE status != excluded.status
+                        """,
+                        batch
+                    )
+            return self.conn.total_changes - changes_before
+        except sqlite3.Error as e:
+            logging.error(f"Error upserting domains: {e}")
+            return 0
+
     def close(self) -> None:
         """Close database connection"""
         if self.conn:
             try:
                 self.conn.close()
             except sqlite3.Error:
-                pass
\ No newline at end of file
+                pass
+
+
+def get_db() -> DatabaseManager:
+    """
+    Get the shared database manager for the default database
+
+    Returns:
+        DatabaseManager: Manager holding a persistent connection
+    """
+    global _db_instance
+
+    if _db_instance is None:
+        _db_instance = DatabaseManager()
+
+    return _db_instance
\ No newline at end of file
@@ -7,13 +7,85 @@
 
 import re
 import logging
+import functools
+import threading
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from typing import Optional, Tuple
 
 import dns.resolver
 import dns.exception
 
 from .config import get_settings
 
+# WHOIS text fields of interest; "Status" also matches "Domain Status"
+_WHOIS_FIELD_RE = re.compile(r'(Registrar|Status|Name Server):[ \t]*(.+)', re.IGNORECASE)
+
+# Upper bound on concurrent DNS queries per delegation step
+_MAX_PROBE_WORKERS = 8
+
+# Resolvers are reused per thread and probes share one worker pool, so
+# delegation checks don't pay resolver and thread setup on every query
+_resolver_local = threading.local()
+_probe_executor = None
+_probe_executor_lock = threading.Lock()
+
+# python-whois is optional; without it the system whois client is used
+try:
+    import whois as whois_lib
+except ImportError:
+    whois_lib = None
+
+def _first(value):
+    """Return the first item of a list-valued WHOIS field, or the value itself"""
+    if isinstance(value, (list, tuple)):
+        return value[0] if value else None
+    return value
+
+@functools.lru_cache(maxsize=4096)
+def _lookup_whois(domain: str) -> Tuple[Optional[str], Optional[str], Tuple[str, ...]]:
+    """
+    Look up WHOIS data for a domain, caching results for the process lifetime
+    
+    Failed lookups raise and are therefore not cached.
+    
+    Returns:
+        tuple: (registrar, status, nameservers)
+    """
+    if whois_lib is not None and hasattr(whois_lib, 'whois'):
+        entry = whois_lib.whois(domain)
+        registrar = _first(entry.get('registrar'))
+        status = _first(entry.get('status'))
+        nameservers = entry.get('name_servers') or []
+        if isinstance(nameservers, str):
+            nameservers = [nameservers]
+        return (
+            registrar.strip() if registrar else None,
+            status.strip() if status else None,
+            tuple(sorted({ns.strip().lower() for ns in nameservers if ns}))
+        )
+    
+    # Fall back to the whois client, without a shell in between
+    whois_output = subprocess.run(
+        ['whois', domain], capture_output=True, text=True
+    ).stdout
+    
+    # Extract key information in a single scan of the output
+    registrar = None
+    status = None
+    nameservers = []
+    for match in _WHOIS_FIELD_RE.finditer(whois_output):
+        field = match.group(1).lower()
+        value = match.group(2).strip()
+        if field == 'name server':
+            nameservers.append(value.lower())
+        elif field == 'registrar':
+            if registrar is None:
+                registrar = value
+        elif status is None:
+            status = value
+    return registrar, status, tuple(nameservers)
+
 def check_whois(domain):
     """
     Check domain's WHOIS record to verify registrar and registration status.
@@ -33,25 +105,13 @@ def check_whois(domain):
     }
     
     try:
-        # Basic whois implementation using subprocess
-        cmd = f"whois {domain}"
-        whois_output = subprocess.getoutput(cmd)
-        
-        # Extract key information using regex patterns
-        registrar_match = re.search(r'Registrar:\s*(.+)', whois_output)
-        if registrar_match:
-            result['registrar'] = registrar_match.group(1).strip()
-        
-        status_match = re.search(r'Status:\s*(.+)', whois_output)
-        if status_match:
-            result['status'] = status_match.group(1).strip()
-            
-        ns_matches = re.findall(r'Name Server:\s*(.+)', whois_output)
-        if ns_matches:
-            result['nameservers'] = [ns.strip().lower() for ns in ns_matches]
+        registrar, status, nameservers = _lookup_whois(domain.lower().rstrip('.'))
+        result['registrar'] = registrar
+        result['status'] = status
+        result['nameservers'] = list(nameservers)
             
         # Basic verification
-        if result['status'] and 'nameservers' in result and len(result['nameservers']) > 0:
+        if result['status'] and len(result['nameservers']) > 0:
             result['verified'] = True
         
     except Exception as e:
@@ -59,6 +119,78 @@ def check_whois(domain):
     
     return result
 
+def _query(ns_ip, name, rdtype):
+    """Query a single nameserver using this thread's cached resolver"""
+    resolver = getattr(_resolver_local, 'resolver', None)
+    if resolver is None:
+        resolver = dns.resolver.Resolver(configure=False)
+        resolver.timeout = 5
+        resolver.lifetime = 5
+        _resolver_local.resolver = resolver
+    resolver.nameservers = [ns_ip]
+    return resolver.resolve(name, rdtype)
+
+def _get_probe_executor():
+    """Get the shared thread pool used for concurrent DNS probes"""
+    global _probe_executor
+    
+    with _probe_executor_lock:
+        if _probe_executor is None:
+            _probe_executor = ThreadPoolExecutor(
+                max_workers=_MAX_PROBE_WORKERS, thread_name_prefix='dns-probe')
+    return _probe_executor
+
+def _first_successful(nameservers, zone, rdtype):
+    """
+    Query several nameservers concurrently and return the first answer
+    
+    NXDOMAIN/NoAnswer responses are skipped silently; other failures are
+    collected and only matter if no server answers.
+    
+    Returns:
+        tuple: (ns_ip, answer, errors); ns_ip and answer are None if no server answered
+    """
+    errors = []
+    if not nameservers:
+        return None, None, errors
+    
+    executor = _get_probe_executor()
+    pending = {
+        executor.submit(_query, ns_ip, zone, rdtype): ns_ip
+        for ns_ip in nameservers
+    }
+    try:
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                ns_ip = pending.pop(future)
+                try:
+                    return ns_ip, future.result(), errors
+                except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+                    continue
+                except Exception as e:
+                    errors.append(f"Error tracing {zone}: {e}")
+        return None, None, errors
+    finally:
+        # Don't wait for slower servers once we have an answer
+        for future in pending:
+            future.cancel()
+
+def _resolve_addresses(ns_ip, hostnames):
+    """Resolve A records for several hostnames concurrently via one nameserver"""
+    addresses = []
+    if not hostnames:
+        return addresses
+    
+    executor = _get_probe_executor()
+    futures = [executor.submit(_query, ns_ip, host, 'A') for host in hostnames]
+    for future in as_completed(futures):
+        try:
+            addresses.extend(ip.address for ip in future.result())
+        except Exception:
+            pass
+    return addresses
+
 def check_authoritative_ns(domain):
     """
     Trace authoritative nameserver delegation from root
@@ -97,61 +229,47 @@ def check_authoritative_ns(domain):
     domain_parts = domain.lower().rstrip('.').split('.')
     
     try:
-        # Resolver configuration
-        resolver = dns.resolver.Resolver(configure=False)
-        resolver.timeout = 5
-        resolver.lifetime = 5
-        
         # Start with root servers
         current_nameservers = root_servers
+        previous_ns_set = None
         
         # Trace delegation from root to TLD, then to authoritative
         for i in range(len(domain_parts)-1, -1, -1):
             # Construct current zone
             current_zone = '.'.join(domain_parts[i:])
             
-            # Try each root/current nameserver
-            found_delegation = False
-            for ns_ip in current_nameservers:
-                resolver.nameservers = [ns_ip]
-                
-                try:
-                    # Query for nameservers of current zone
-                    ns_answers = resolver.resolve(current_zone, 'NS')
-                    
-                    # Get new nameserver IPs
-                    new_nameservers = []
-                    ns_hostnames = [str(rr.target) for rr in ns_answers]
-                    
-                    # Resolve nameserver IPs
-                    for ns_host in ns_hostnames:
-                        try:
-                            ip_answers = resolver.resolve(ns_host, 'A')
-                            new_nameservers.extend([ip.address for ip in ip_answers])
-                        except Exception:
-                            pass
-                    
-                    # Record delegation step
-                    delegation_result['delegation_path'].append({
-                        'zone': current_zone,
-                        'nameservers': ns_hostnames,
-                        'nameserver_ips': new_nameservers
-                    })
-                    
-                    # Update current nameservers for next iteration
-                    current_nameservers = new_nameservers
-                    found_delegation = True
-                    break
-                
-                except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
-                    continue
-                except Exception as e:
-                    delegation_result['errors'].append(f"Error tracing {current_zone}: {e}")
+            # Query all current nameservers at once; the first answer wins
+            ns_ip, ns_answers, errors = _first_successful(
+                current_nameservers, current_zone, 'NS')
             
             # Break if no delegation found
-            if not found_delegation:
+            if ns_answers is None:
+                delegation_result['errors'].extend(errors)
                 delegation_result['errors'].append(f"No delegation found for {current_zone}")
                 break
+            
+            ns_hostnames = [str(rr.target) for rr in ns_answers]
+            ns_set = frozenset(ns_hostnames)
+            
+            # Same nameservers as the parent zone (e.g. uk and co.uk): reuse
+            # the parent's addresses, but keep walking down to the domain
+            # itself, which may still be undelegated
+            if ns_set == previous_ns_set:
+                new_nameservers = current_nameservers
+            else:
+                # Resolve nameserver IPs concurrently via the answering server
+                new_nameservers = _resolve_addresses(ns_ip, ns_hostnames)
+            
+            # Record delegation step
+            delegation_result['delegation_path'].append({
+                'zone': current_zone,
+                'nameservers': ns_hostnames,
+                'nameserver_ips': new_nameservers
+            })
+            
+            # Update current nameservers for next iteration
+            current_nameservers = new_nameservers
+            previous_ns_set = ns_set
         
         # Verify delegation
         delegation_result['verified'] = (
@@ -7,15 +7,19 @@
 
 import os
 import json
+import time
 import logging
+import functools
 import subprocess
-from datetime import datetime
-from typing import Dict, Set, List, Tuple, Any, Optional
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Set, FrozenSet, List, Tuple, Any, Optional
 
 from .config import get_settings
 from .pdns import disconnect_zone_from_cpanel
 from .zones import check_zone_sync, fix_soa_drift
-from .db_manager import DatabaseManager
+from .db_manager import get_db
+from .utils import json_loads
 
 def load_domain_tracking() -> Dict[str, Dict[str, Any]]:
     """
@@ -25,13 +29,13 @@ def load_domain_tracking() -> Dict[str, Dict[str, Any]]:
         dict: Dictionary with domain info in the format:
         {
             "domain.com": {
-                "timestamp": "2025-03-13 04:00:00",
+                "timestamp": 1741838400,  # epoch seconds
                 "status": "active"
             },
             ...
         }
     """
-    db = DatabaseManager()
+    db = get_db()
     return db.load_domain_tracking()
 
 def save_domain_tracking(domains: Dict[str, Dict[str, Any]]) -> bool:
@@ -44,7 +48,7 @@ def save_domain_tracking(domains: Dict[str, Dict[str, Any]]) -> bool:
     Returns:
         bool: True if successful, False otherwise
     """
-    db = DatabaseManager()
+    db = get_db()
     return db.save_domain_tracking(domains)
 
 def load_active_zones() -> Set[str]:
@@ -54,10 +58,39 @@ def load_active_zones() -> Set[str]:
     Returns:
         set: Set of active domain names
     """
-    db = DatabaseManager()
+    db = get_db()
     active_domains = db.get_domains_by_status("active")
     return set(active_domains)
 
+@functools.lru_cache(maxsize=None)
+def _fetch_user_domains(user: str) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """
+    Get addon and parked domains for a cPanel user (cached per run)
+    
+    Args:
+        user: cPanel account name
+        
+    Returns:
+        tuple: (addon_domains, parked_domains); both empty on error
+    """
+    try:
+        addon_cmd = subprocess.run(
+            ['uapi', f'--user={user}', 'DomainInfo', 'list_domains', '--output=json'],
+            capture_output=True
+        ).stdout
+        # Parse the raw bytes directly; no intermediate str decode
+        addon_data = json_loads(addon_cmd)
+        if addon_data['result']['status'] == 1:
+            data = addon_data['result']['data']
+            addon_domains = frozenset(d.lower().rstrip('.') for d in data['addon_domains'])
+            parked_domains = frozenset(d.lower().rstrip('.') for d in data['parked_domains'])
+            return addon_domains, parked_domains
+    except OSError as e:
+        logging.error(f"Error running uapi for user {user}: {e}")
+    except (json.JSONDecodeError, KeyError) as e:
+        logging.error(f"Error parsing addon domain data for user {user}: {e}")
+    return frozenset(), frozenset()
+
 def get_affiliated_domains() -> Set[str]:
     """
     Get all domains affiliated with active user accounts in cPanel
@@ -70,7 +103,7 @@ def get_affiliated_domains() -> Set[str]:
     # Get all user accounts
     account_cmd = subprocess.getoutput('whmapi1 listaccts --output=json')
     try:
-        account_data = json.loads(account_cmd)
+        account_data = json_loads(account_cmd)
         accounts = [acc['user'] for acc in account_data['data']['acct'] if acc['suspended'] == 0]
     except (json.JSONDecodeError, KeyError) as e:
         logging.error(f"Error parsing account data: {e}")
@@ -81,31 +114,21 @@ def get_affiliated_domains() -> Set[str]:
     # Get main domains from listzones
     zones_cmd = subprocess.getoutput('whmapi1 listzones --output=json')
     try:
-        zones_data = json.loads(zones_cmd)
+        zones_data = json_loads(zones_cmd)
         main_domains = {z['domain'].lower().rstrip('.') for z in zones_data['data']['zone']}
         affiliated_domains.update(main_domains)
         logging.info(f"Found {len(main_domains)} main domains from listzones")
     except (json.JSONDecodeError, KeyError) as e:
         logging.error(f"Error parsing zone data: {e}")
 
-    # Get addon domains for each account
+    # Get addon domains for each account, fetching accounts in parallel
     total_addons = 0
-    for user in accounts:
-        addon_cmd = subprocess.getoutput(f'uapi --user={user} DomainInfo list_domains --output=json')
-        try:
-            addon_data = json.loads(addon_cmd)
-            if addon_data['result']['status'] == 1:
-                # Add addon domains
-                addon_domains = {d.lower().rstrip('.') for d in addon_data['result']['data']['addon_domains']}
+    if accounts:
+        with ThreadPoolExecutor(max_workers=min(32, len(accounts))) as executor:
+            for addon_domains, parked_domains in executor.map(_fetch_user_domains, accounts):
                 affiliated_domains.update(addon_domains)
-                total_addons += len(addon_domains)
-
-                # Add parked/aliased domains
-                parked_domains = {d.lower().rstrip('.') for d in addon_data['result']['data']['parked_domains']}
                 affiliated_domains.update(parked_domains)
-
-        except (json.JSONDecodeError, KeyError) as e:
-            logging.error(f"Error parsing addon domain data for user {user}: {e}")
+                total_addons += len(addon_domains)
 
     logging.info(f"Found {total_addons} addon domains across all accounts")
 
@@ -121,35 +144,21 @@ def handle_removed_zones(dryrun: bool = False) -> None:
     Args:
         dryrun (bool): If True, only log what would be done
     """
-    db = DatabaseManager()
-    inactive_domains = db.get_domains_by_status("inactive")
-    tracking = db.load_domain_tracking()
+    db = get_db()
     
-    domains_to_process = []
-    for domain in inactive_domains:
-        if domain in tracking:
-            timestamp = tracking[domain].get('timestamp')
-            try:
-                domain_time = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
-                
-                # Check if domain has been in removal state for more than 1 hour (3600 seconds)
-                if (datetime.now() - domain_time).total_seconds() > 3600:
-                    domains_to_process.append(domain)
-            except (ValueError, TypeError):
-                continue
+    # Domains that have been in removal state for more than 1 hour (3600 seconds)
+    domains_to_process = db.get_stale_inactive(int(time.time()) - 3600)
 
+    removed = []
     for domain in domains_to_process:
         logging.info(f"Domain {domain} has been marked for removal for more than 1 hour. Removing...")
         if not dryrun:
             disconnect_zone_from_cpanel(domain, dryrun)
-            # Remove from tracking after disconnecting
-            if domain in tracking:
-                del tracking[domain]
+            removed.append(domain)
     
-    # Save updated tracking
-    if domains_to_process and not dryrun:
-        db.save_domain_tracking(tracking)
-        logging.info(f"Removed {len(domains_to_process)} domains from tracking")
+    # Remove from tracking after disconnecting
+    if removed and db.delete_domains(removed):
+        logging.info(f"Removed {len(removed)} domains from tracking")
 
 def process_domain_queue(max_domains: int = 10, distribution: Tuple[int, int, int] = (4, 4, 2), dryrun: bool = True) -> Dict[str, Any]:
     """
@@ -164,7 +173,7 @@ def process_domain_queue(max_domains: int = 10, distribution: Tuple[int, int, in
         dict: Processing results including domains processed and status
     """
     settings = get_settings()
-    db = DatabaseManager()
+    db = get_db()
     
     results = {
         'total_processed': 0,
@@ -175,50 +184,45 @@ def process_domain_queue(max_domains: int = 10, distribution: Tuple[int, int, in
     }
     
     # Get current timestamp for updating domain status
-    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    current_time = int(time.time())
     
-    # Load domain tracking information
-    domain_tracking = db.load_domain_tracking()
+    # Per-category quotas, in processing order
+    quotas = {
+        'new': distribution[0],
+        'existing': distribution[1],
+        'orphan': distribution[2]
+    }
     
-    # Categorize domains
-    new_domains = []
-    existing_domains = []
-    orphan_domains = []
+    # Bucket domains by category; rows arrive sorted by timestamp (oldest
+    # first), so each bucket holds the oldest domains once its quota is full
+    buckets = defaultdict(list)
+    remaining = sum(quotas.values())
     
-    for domain, info in domain_tracking.items():
-        if info['status'] == 'active':
-            if info.get('timestamp') is None:
-                new_domains.append(domain)
-            else:
-                existing_domains.append(domain)
-        elif info['status'] == 'orphan':
-            orphan_domains.append(domain)
+    for domain, status, timestamp, _ in db.iter_domains_by_statuses(('active', 'orphan')):
+        if remaining <= 0:
+            break
+        if status == 'orphan':
+            queue_type = 'orphan'
+        elif not timestamp:
+            queue_type = 'new'
+        else:
+            queue_type = 'existing'
+        
+        bucket = buckets[queue_type]
+        if len(bucket) < quotas[queue_type]:
+            bucket.append(domain)
+            remaining -= 1
     
-    # Sort domains by timestamp (oldest first)
-    def get_timestamp(domain):
-        try:
-            timestamp = domain_tracking[domain].get('timestamp')
-            if timestamp:
-                return datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
-            return datetime.min
-        except (ValueError, TypeError):
-            return datetime.min
+    if not any(buckets.values()):
+        logging.info("No domains queued for processing")
+        return results
     
-    new_domains.sort(key=get_timestamp)
-    existing_domains.sort(key=get_timestamp)
-    orphan_domains.sort(key=get_timestamp)
+    # Domains whose timestamp must be refreshed after processing
+    touched = []
     
     # Process domains from each category
-    queue_types = [
-        ('new', new_domains, distribution[0]),
-        ('existing', existing_domains, distribution[1]),
-        ('orphan', orphan_domains, distribution[2])
-    ]
-    
-    for queue_type, domains, quota in queue_types:
-        domains_to_process = domains[:quota]
-        
-        for domain in domains_to_process:
+    for queue_type in quotas:
+        for domain in buckets[queue_type]:
             # Skip if we've reached the maximum
             if results['total_processed'] >= max_domains:
                 break
@@ -228,8 +232,8 @@ def process_domain_queue(max_domains: int = 10, distribution: Tuple[int, int, in
             # Check synchronization status
             sync_status = check_zone_sync(domain)
             
-            # Update domain tracking information
-            domain_tracking[domain]['timestamp'] = current_time
+            # Remember domain for the tracking timestamp update
+            touched.append(domain)
             
             # Update status in results
             results['total_processed'] += 1
@@ -274,8 +278,9 @@ def process_domain_queue(max_domains: int = 10, distribution: Tuple[int, int, in
                 else:
                     logging.error(f"Failed to fix SOA drift for {domain}: {message}")
     
-    # Save updated domain tracking information
-    db.save_domain_tracking(domain_tracking)
+    # Update timestamps of processed domains only
+    if touched:
+        db.update_timestamps(touched, current_time)
     
     logging.info(f"Processed {results['total_processed']} domains: " +
                 f"{results['success_count']} success, " +
@@ -8,13 +8,17 @@
 import logging
 import time
 import functools
+import threading
 from typing import Callable, Any, Dict, Optional, TypeVar, cast
 import random
-from datetime import datetime, timedelta
 
 # Type variable for function return type
 T = TypeVar('T')
 
+# Set by interrupt_retries() to wake up and abort any pending backoff wait.
+# Never cleared: it is only set on the way to process exit.
+_retry_interrupt = threading.Event()
+
 class CircuitBreakerError(Exception):
     """Exception raised when circuit breaker is open"""
     pass
@@ -48,13 +52,15 @@ class CircuitBreaker:
         self.name = name
         self.state = self.CLOSED
         self.failure_count = 0
+        # time.monotonic() of the last failure; immune to wall-clock jumps
         self.last_failure_time = None
         
     def __enter__(self):
         """Context manager entry point"""
         if self.state == self.OPEN:
             # Check if recovery timeout has elapsed
-            if self.last_failure_time and datetime.now() > self.last_failure_time + timedelta(seconds=self.recovery_timeout):
+            if (self.last_failure_time is not None and
+                    time.monotonic() - self.last_failure_time > self.recovery_timeout):
                 logging.info(f"Circuit {self.name} transitioning from OPEN to HALF-OPEN")
                 self.state = self.HALF_OPEN
             else:
@@ -82,7 +88,7 @@ class CircuitBreaker:
     def failure(self):
         """Record failed operation"""
         self.failure_count += 1
-        self.last_failure_time = datetime.now()
+        self.last_failure_time = time.monotonic()
         
         if self.state == self.CLOSED and self.failure_count >= self.failure_threshold:
             # Too many failures, open the circuit
@@ -94,11 +100,24 @@ class CircuitBreaker:
             self.state = self.OPEN
 
 
+def interrupt_retries() -> None:
+    """
+    Abort pending retry waits during shutdown.
+    
+    Called from the termination signal handler. This is process-terminal:
+    the flag is never cleared, so every later retry also fails fast.
+    """
+    _retry_interrupt.set()
+
+
 def retry_with_backoff(max_retries: int = 3, backoff_factor: float = 2, 
                        jitter: bool = True, exceptions: tuple = (Exception,)) -> Callable:
     """
     Decorator for retrying a function with exponential backoff.
     
+    Backoff waits can be cut short with interrupt_retries(), in which case
+    the last exception is re-raised immediately.
+    
     Args:
         max_retries: Maximum number of retries
         backoff_factor: Multiplier for backoff time between retries
@@ -108,6 +127,9 @@ def retry_with_backoff(max_retries: int = 3, backoff_factor: float = 2,
     Returns:
         Decorated function
     """
+    # Base backoff for each retry, computed once per decorated function
+    schedule = tuple(backoff_factor ** i for i in range(1, max_retries + 1))
+    
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> T:
@@ -121,12 +143,14 @@ def retry_with_backoff(max_retries: int = 3, backoff_factor: float = 2,
                         logging.error(f"Maximum retries ({max_retries}) exceeded for {func.__name__}")
                         raise
                     
-                    # Calculate backoff time
-                    backoff_time = backoff_factor ** retry_count
+                    # Look up backoff time
+                    backoff_time = schedule[retry_count - 1]
                     if jitter:
                         backoff_time = backoff_time * (0.5 + random.random())
                     
                     logging.warning(f"Retry {retry_count}/{max_retries} for {func.__name__} after {backoff_time:.2f}s: {str(e)}")
-                    time.sleep(backoff_time)
+                    if _retry_interrupt.wait(timeout=backoff_time):
+                        logging.warning(f"Retries for {func.__name__} interrupted")
+                        raise
         return cast(Callable[..., T], wrapper)
     return decorator
\ No newline at end of file
@@ -13,11 +13,13 @@ import fcntl
 import signal
 import atexit
 import logging
+import socket
 import hashlib
-import subprocess
 import errno
 from datetime import datetime
 
+from .error_handling import interrupt_retries
+
 # Constants
 LOCK_FILE = '/tmp/dnssync.lock'
 LOCK_STALE_THRESHOLD = 3600  # Lock considered stale after 1 hour
@@ -25,6 +27,127 @@ LOCK_STALE_THRESHOLD = 3600  # Lock considered stale after 1 hour
 # Global variables
 lock_file_handle = None  # Keep lock file handle in global scope
 
+
+def _file_hash(path, chunk_size=65536):
+    """Return the first 8 hex digits of a file's MD5, read in chunks"""
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:8]
+
+
+# Identify this host and the running code in the lock file; fixed for the
+# process lifetime
+HOSTNAME = socket.gethostname()
+SCRIPT_PATH = os.path.abspath(__file__)
+SCRIPT_HASH = _file_hash(SCRIPT_PATH)
+
+def _lock_owner_alive(pid):
+    """
+    Check whether the process recorded in a lock file is still running
+    
+    PIDs 0 and 1 and our own PID never count as a live owner: signalling
+    them would hit the process group, init, or ourselves. On Linux the
+    check uses /proc, which works regardless of which user owns the
+    process, and also matches the command line so a PID reused by an
+    unrelated process after a crash doesn't hold the lock forever.
+    Elsewhere it falls back to signal 0.
+    """
+    if not isinstance(pid, int) or pid <= 1 or pid == os.getpid():
+        return False
+    
+    if os.path.isdir('/proc/self'):
+        try:
+            with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                cmdline = f.read()
+        except FileNotFoundError:
+            return False
+        except OSError:
+            return True  # Assume process exists if we can't check
+        return b'python' in cmdline or b'dnssync' in cmdline
+    
+    try:
+        os.kill(pid, 0)  # Signal 0 tests if process exists
+    except OSError as e:
+        if e.errno == errno.ESRCH:  # No such process
+            return False
+    return True  # Alive, or EPERM: exists but owned by another user
+
+def _lock_is_abandoned(f):
+    """
+    Inspect the contents of a lock file held by another process
+    
+    Returns:
+        bool: True if the owner is gone and the lock is older than
+            LOCK_STALE_THRESHOLD, so it may be broken
+    """
+    try:
+        lock_data = json.loads(f.read().strip() or '{}')
+    except json.JSONDecodeError:
+        lock_data = {}
+    
+    lock_pid = lock_data.get('pid')
+    lock_time = lock_data.get('timestamp')
+    
+    # Check if PID exists
+    pid_exists = _lock_owner_alive(lock_pid)
+    
+    # Check if lock is stale by time
+    lock_is_stale = False
+    if lock_time:
+        try:
+            lock_timestamp = float(lock_time)
+            if time.time() - lock_timestamp > LOCK_STALE_THRESHOLD:
+                lock_is_stale = True
+        except (ValueError, TypeError):
+            pass  # Keep lock_is_stale as False if timestamp is invalid
+    
+    # If both PID doesn't exist and lock is stale, break the lock
+    if not pid_exists and lock_is_stale:
+        logging.warning(f"Removing stale lock (PID: {lock_pid}, Time: {lock_time})")
+        return True
+    
+    logging.error(f"Another instance is running (PID: {lock_pid}, Time: {lock_time})")
+    return False
+
+def _holds_current_file(handle):
+    """Check that a lock file handle still refers to the file at LOCK_FILE"""
+    try:
+        return os.stat(LOCK_FILE).st_ino == os.fstat(handle.fileno()).st_ino
+    except FileNotFoundError:
+        return False
+
+def _publish_lock_data(handle, lock_data):
+    """
+    Atomically replace LOCK_FILE with a new file holding lock_data
+    
+    The new file is written and locked under a temporary name before it is
+    renamed into place, so readers only ever see complete JSON and the lock
+    is held throughout. The old handle is closed.
+    
+    Returns:
+        file handle: Locked handle for the new lock file
+    """
+    tmp_path = f"{LOCK_FILE}.{os.getpid()}.tmp"
+    new_handle = os.fdopen(os.open(tmp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644), 'r+')
+    try:
+        new_handle.write(json.dumps(lock_data))
+        new_handle.flush()
+        os.fsync(new_handle.fileno())
+        fcntl.flock(new_handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        os.replace(tmp_path, LOCK_FILE)
+    except Exception:
+        new_handle.close()
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    
+    handle.close()
+    return new_handle
+
 def acquire_lock():
     """
     Acquire process lock with multiple safeguards:
@@ -33,75 +156,75 @@ def acquire_lock():
     3. Timestamp tracking to detect abandoned locks
     4. Cleanup of stale locks
     
+    The lock is taken before the file is read, so the uncontended path is
+    just open + flock; the existing contents are only inspected when
+    another process holds the lock. Because the lock file is replaced
+    rather than rewritten, a lock only counts once it is confirmed to be
+    on the file currently at LOCK_FILE.
+    
     Returns:
         file handle: Lock file handle to maintain lock
     """
     global lock_file_handle
     
-    if os.path.exists(LOCK_FILE):
-        # Check if lock is stale
+    # Re-entry: we already hold the lock
+    if lock_file_handle is not None:
+        return lock_file_handle
+    
+    # A few attempts: the file may be replaced or broken as stale under us
+    for _ in range(3):
+        try:
+            fd = os.open(LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+            handle = os.fdopen(fd, 'r+')
+        except OSError as e:
+            logging.error(f"Failed to open lock file: {e}")
+            sys.exit(1)
+        
         try:
-            with open(LOCK_FILE, 'r') as f:
-                try:
-                    lock_data = json.loads(f.read().strip() or '{}')
-                except json.JSONDecodeError:
-                    lock_data = {}
-                
-                lock_pid = lock_data.get('pid')
-                lock_time = lock_data.get('timestamp')
-                
-                # Check if PID exists
-                pid_exists = False
-                if lock_pid:
-                    try:
-                        os.kill(lock_pid, 0)  # Signal 0 tests if process exists
-                        pid_exists = True
-                    except OSError as e:
-                        if e.errno == errno.ESRCH:  # No such process
-                            pid_exists = False
-                        else:  # Permission error or other
-                            pid_exists = True  # Assume process exists if we can't check
-                
-                # Check if lock is stale by time
-                lock_is_stale = False
-                if lock_time:
-                    try:
-                        lock_timestamp = float(lock_time)
-                        if time.time() - lock_timestamp > LOCK_STALE_THRESHOLD:
-                            lock_is_stale = True
-                    except (ValueError, TypeError):
-                        pass  # Keep lock_is_stale as False if timestamp is invalid
-                
-                # If both PID doesn't exist and lock is stale, break the lock
-                if (not pid_exists or lock_is_stale) and (not pid_exists or lock_is_stale):
-                    logging.warning(f"Removing stale lock (PID: {lock_pid}, Time: {lock_time})")
-                    # We don't remove here - we'll overwrite safely later
-                else:
-                    logging.error(f"Another instance is running (PID: {lock_pid}, Time: {lock_time})")
-                    sys.exit(1)
+            # Acquire exclusive lock
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError as e:
+            if e.errno not in (errno.EAGAIN, errno.EACCES):
+                handle.close()
+                logging.error(f"Failed to acquire lock: {e}")
+                sys.exit(1)
+        else:
+            if _holds_current_file(handle):
+                break
+            # Locked a file that has since been replaced or removed
+            handle.close()
+            continue
+        
+        # Held by another process; check whether it was abandoned
+        try:
+            abandoned = _lock_is_abandoned(handle)
         except Exception as e:
             logging.error(f"Error checking lock file: {e}")
+            abandoned = False
+        handle.close()
+        
+        if not abandoned:
             sys.exit(1)
+        
+        try:
+            os.unlink(LOCK_FILE)
+        except FileNotFoundError:
+            pass
+    else:
+        logging.error("Failed to acquire lock: another instance is running")
+        sys.exit(1)
     
-    # Create or overwrite the lock file with our information
-    script_path = os.path.abspath(__file__)
-    script_hash = hashlib.md5(open(script_path, 'rb').read()).hexdigest()[:8]
     lock_data = {
         'pid': os.getpid(),
         'timestamp': time.time(),
-        'hostname': subprocess.getoutput('hostname').strip(),
-        'script_path': script_path,
-        'script_hash': script_hash
+        'hostname': HOSTNAME,
+        'script_path': SCRIPT_PATH,
+        'script_hash': SCRIPT_HASH
     }
     
     try:
-        lock_file_handle = open(LOCK_FILE, 'w')
         # Write PID and timestamp information
-        lock_file_handle.write(json.dumps(lock_data))
-        lock_file_handle.flush()
-        
-        # Acquire exclusive lock
-        fcntl.flock(lock_file_handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        lock_file_handle = _publish_lock_data(handle, lock_data)
         logging.info(f"Lock acquired (PID: {os.getpid()})")
         
         # Register cleanup handlers
@@ -110,13 +233,8 @@ def acquire_lock():
         signal.signal(signal.SIGINT, signal_handler)
         
         return lock_file_handle
-    except IOError as e:
-        if e.errno == errno.EAGAIN:
-            logging.error("Failed to acquire lock: another instance is running")
-        else:
-            logging.error(f"Failed to acquire lock: {e}")
-        sys.exit(1)
     except Exception as e:
+        handle.close()
         logging.error(f"Unexpected error acquiring lock: {e}")
         sys.exit(1)
 
@@ -126,23 +244,17 @@ def release_lock():
     if lock_file_handle:
         try:
             logging.info("Releasing lock...")
+            
+            # Remove the lock file while still holding the lock, and only if
+            # it is still ours (it may have been broken as stale)
+            if _holds_current_file(lock_file_handle):
+                os.unlink(LOCK_FILE)
+                logging.info("Lock file removed")
+            else:
+                logging.warning("Lock file owned by another process, not removing")
+            
             fcntl.flock(lock_file_handle, fcntl.LOCK_UN)
             lock_file_handle.close()
-            
-            # Remove the lock file
-            if os.path.exists(LOCK_FILE):
-                try:
-                    with open(LOCK_FILE, 'r') as f:
-                        lock_data = json.loads(f.read().strip() or '{}')
-                    
-                    # Only remove if it's our PID
-                    if lock_data.get('pid') == os.getpid():
-                        os.unlink(LOCK_FILE)
-                        logging.info("Lock file removed")
-                    else:
-                        logging.warning("Lock file owned by another process, not removing")
-                except Exception as e:
-                    logging.error(f"Error removing lock file: {e}")
         except Exception as e:
             logging.error(f"Error releasing lock: {e}")
         lock_file_handle = None
@@ -151,6 +263,7 @@ def signal_handler(signum, frame):
     """Handle termination signals to ensure lock release"""
     signame = signal.Signals(signum).name
     logging.info(f"Received signal {signame} ({signum}), exiting gracefully")
+    interrupt_retries()
     release_lock()
     sys.exit(0)
 
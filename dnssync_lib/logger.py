@@ -24,7 +24,7 @@ def setup_logging(silent=False, show_log=False):
     
     # Ensure log directory exists
     log_dir = os.path.dirname(log_file)
-    if not os.path.exists(log_dir):
+    if log_dir:
         try:
             os.makedirs(log_dir, exist_ok=True)
         except OSError:
@@ -69,8 +69,9 @@ def setup_logging(silent=False, show_log=False):
     
     # Set permissions on log file if possible
     try:
-        if os.path.exists(log_file):
-            os.chmod(log_file, 0o640)
+        os.chmod(log_file, 0o640)
+    except FileNotFoundError:
+        pass
     except OSError:
         logging.warning(f"Could not set permissions on log file {log_file}")
         
@@ -7,31 +7,75 @@
 
 import json
 import logging
-import requests
 from .config import get_settings
 
-def pdns_req(method, domain, data=None):
+# requests (and urllib3) are imported on first API use: they are slow to
+# import and many runs (--help, lock contention, dry runs without PowerDNS
+# calls) never need them
+
+# (connect, read) timeout in seconds for PowerDNS API requests
+PDNS_TIMEOUT = (3.05, 10)
+
+# Retry connection failures and gateway errors a few times with a short
+# backoff; only idempotent methods are retried, so zone creation isn't
+PDNS_RETRY = {'total': 3, 'backoff_factor': 0.2, 'status_forcelist': (502, 503, 504)}
+
+# Shared HTTP session (see get_session); keeps connections to the API alive
+_session = None
+
+# Names of all zones in PowerDNS, listed once per run (see get_zone_names)
+_zone_names = None
+
+def get_session():
+    """
+    Get the shared session for PowerDNS API requests
+    
+    The session carries the API key and JSON content type headers and
+    reuses pooled keep-alive connections across calls.
+    
+    Returns:
+        requests.Session: Configured session
+    """
+    global _session
+    
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        settings = get_settings()
+        session = requests.Session()
+        session.headers.update({
+            'X-API-Key': settings['pdns_api_key'],
+            'Content-Type': 'application/json'
+        })
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=Retry(**PDNS_RETRY))
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _session = session
+    
+    return _session
+
+def _api_request(method, path, data=None):
     """
-    Make a request to the PowerDNS API
+    Make a request to a path below the PowerDNS server URL
     
     Args:
         method (str): HTTP method ('GET', 'PUT', 'POST', 'DELETE')
-        domain (str): Domain name for the request
+        path (str): Path relative to pdns_api_url, e.g. '/zones'
         data (dict, optional): JSON data to send with the request
         
     Returns:
-        requests.Response or None: API response or None on error
+        requests.Response or None: API response, or None on error, timeout
+            or once retries are exhausted
     """
-    settings = get_settings()
-    headers = {'X-API-Key': settings['pdns_api_key'], 'Content-Type': 'application/json'}
-    
-    # Ensure domain has trailing dot for API
-    domain_with_dot = domain if domain.endswith('.') else f"{domain}."
+    import requests
     
-    url = f"{settings['pdns_api_url']}/zones/{domain_with_dot}"
+    settings = get_settings()
+    url = f"{settings['pdns_api_url']}{path}"
     
     try:
-        response = requests.request(method, url, headers=headers, json=data)
+        response = get_session().request(method, url, json=data, timeout=PDNS_TIMEOUT)
         if response.status_code >= 400 and response.status_code != 404:
             logging.error(f"PowerDNS API error: {response.status_code} - {response.text}")
         return response
@@ -39,6 +83,44 @@ def pdns_req(method, domain, data=None):
         logging.error(f"PowerDNS API request failed: {str(e)}")
         return None
 
+def pdns_req(method, domain, data=None):
+    """
+    Make a request to the PowerDNS API for a single zone
+    
+    Args:
+        method (str): HTTP method ('GET', 'PUT', 'POST', 'DELETE')
+        domain (str): Domain name for the request
+        data (dict, optional): JSON data to send with the request
+        
+    Returns:
+        requests.Response or None: API response, or None on error, timeout
+            or once retries are exhausted
+    """
+    # Ensure domain has trailing dot for API
+    domain_with_dot = domain if domain.endswith('.') else f"{domain}."
+    
+    return _api_request(method, f"/zones/{domain_with_dot}", data)
+
+def get_zone_names():
+    """
+    Get the names of all zones in PowerDNS
+    
+    The zone list is fetched with a single GET /zones on first use and
+    reused for the rest of the run, instead of one GET per domain.
+    
+    Returns:
+        set or None: Zone names with trailing dot, or None if listing failed
+    """
+    global _zone_names
+    
+    if _zone_names is None:
+        response = _api_request('GET', '/zones')
+        if response is None or not response.ok:
+            return None
+        _zone_names = {zone['name'] for zone in response.json()}
+    
+    return _zone_names
+
 def create_pdns_zone(domain, dryrun=False, verbose=False):
     """
     Create a new zone in PowerDNS
@@ -52,19 +134,25 @@ def create_pdns_zone(domain, dryrun=False, verbose=False):
         bool: True if successful or dry run, False if error
     """
     settings = get_settings()
+    zone_name = domain if domain.endswith('.') else f"{domain}."
     
-    # Check if zone already exists
-    response = pdns_req('GET', domain)
-    if response and response.ok:
+    # Check if zone already exists, using the zone list when available
+    zone_names = get_zone_names()
+    if zone_names is not None:
+        exists = zone_name in zone_names
+    else:
+        response = pdns_req('GET', domain)
+        exists = response is not None and response.ok
+    if exists:
         logging.info(f"Zone {domain} already exists in PowerDNS")
         return True
     
     # Basic zone data 
     zone_data = {
-        'name': domain if domain.endswith('.') else f"{domain}.",
+        'name': zone_name,
         'kind': 'Native',
         'masters': [],
-        'nameservers': settings['nameservers'],
+        'nameservers': [f"{ns}." for ns in sorted(settings['primary_ns'])],
         'soa_edit_api': 'INCEPTION-INCREMENT'
     }
     
@@ -76,9 +164,15 @@ def create_pdns_zone(domain, dryrun=False, verbose=False):
         return True
     
     # Create zone
-    response = pdns_req('POST', '/zones', zone_data)
-    if response and response.status_code in (201, 204):
+    response = _api_request('POST', '/zones', zone_data)
+    if response is not None and response.status_code in (201, 204):
         logging.info(f"Created zone {domain} in PowerDNS")
+        if _zone_names is not None:
+            _zone_names.add(zone_name)
+        return True
+    elif response is not None and response.status_code == 409:
+        # Created since the zone list was fetched
+        logging.info(f"Zone {domain} already exists in PowerDNS")
         return True
     else:
         logging.error(f"Failed to create zone {domain}: {getattr(response, 'text', 'N/A')}")
@@ -6,16 +6,38 @@
 # Version: 4.0
 
 import argparse
+import functools
 import sys
 import os
 from typing import Any, Dict, List, Optional, Union
 
-def parse_arguments():
+# orjson is optional; its JSONDecodeError subclasses json.JSONDecodeError,
+# so callers can keep catching the standard library exception.
+try:
+    import orjson
+
+    def json_loads(data: Union[str, bytes]) -> Any:
+        """Deserialize JSON from str or bytes"""
+        return orjson.loads(data)
+
+    def json_dumps(obj: Any) -> str:
+        """Serialize an object to a JSON string"""
+        return orjson.dumps(obj).decode()
+except ImportError:
+    import json
+
+    json_loads = json.loads
+    json_dumps = json.dumps
+
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
     """
-    Parse command-line arguments for the DNS sync tool
+    Build the command-line parser for the DNS sync tool
+    
+    The parser is built on first use and reused afterwards.
     
     Returns:
-        argparse.Namespace: Parsed command-line arguments
+        argparse.ArgumentParser: Configured parser
     """
     parser = argparse.ArgumentParser(
         description="DNS Synchronization and Management Tool for cPanel environments"
@@ -73,7 +95,17 @@ def parse_arguments():
         help="Show log messages"
     )
     
-    args = parser.parse_args()
+    return parser
+
+
+def parse_arguments():
+    """
+    Parse command-line arguments for the DNS sync tool
+    
+    Returns:
+        argparse.Namespace: Parsed command-line arguments
+    """
+    args = _build_parser().parse_args()
     
     # Default to dry-run mode if --write not specified
     if not args.write:
@@ -106,15 +138,16 @@ def read_file_lines(filepath: str) -> List[str]:
     Returns:
         list: List of non-empty, non-comment lines
     """
-    if not os.path.exists(filepath):
+    try:
+        with open(filepath, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
         return []
-        
-    with open(filepath, 'r') as f:
-        lines = f.readlines()
     
-    # Remove comments and strip whitespace
-    return [line.strip() for line in lines 
-            if line.strip() and not line.strip().startswith('#')]
+    # Split in one C-level pass, then remove comments and strip whitespace,
+    # stripping each line only once
+    return [stripped.decode() for stripped in (line.strip() for line in data.splitlines())
+            if stripped and not stripped.startswith(b'#')]
 
 
 def write_file_lines(filepath: str, lines: List[str]) -> None:
@@ -126,5 +159,6 @@ def write_file_lines(filepath: str, lines: List[str]) -> None:
         lines: List of lines to write
     """
     with open(filepath, 'w') as f:
-        for line in lines:
-            f.write(f"{line}\n")
\ No newline at end of file
+        if lines:
+            f.write('\n'.join(lines))
+            f.write('\n')
\ No newline at end of file
@@ -6,9 +6,13 @@
 # Version: 4.0
 
 import os
+import shutil
 import logging
+import functools
+import threading
 import subprocess
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 import dns.resolver
 import dns.zone
@@ -17,6 +21,38 @@ import dns.exception
 from .config import get_settings
 from .delegation import check_authoritative_ns
 
+# Upper bound on concurrent PowerDNS SOA lookups across check_zone_sync calls
+_MAX_SERIAL_WORKERS = 16
+
+# Shared pool for SOA lookups (see _get_serial_executor)
+_serial_executor = None
+_serial_executor_lock = threading.Lock()
+
+def _get_serial_executor():
+    """Get the shared thread pool used to fetch SOA serials concurrently"""
+    global _serial_executor
+    
+    with _serial_executor_lock:
+        if _serial_executor is None:
+            _serial_executor = ThreadPoolExecutor(
+                max_workers=_MAX_SERIAL_WORKERS, thread_name_prefix='soa-serial')
+    return _serial_executor
+
+@functools.lru_cache(maxsize=8)
+def _get_resolver(nameserver, timeout, lifetime):
+    """
+    Get a resolver that queries only the given nameserver
+    
+    Resolvers are cached per target and never modified afterwards, so they
+    can be shared between threads. configure=False skips parsing
+    /etc/resolv.conf.
+    """
+    resolver = dns.resolver.Resolver(configure=False)
+    resolver.nameservers = [nameserver]
+    resolver.timeout = timeout
+    resolver.lifetime = lifetime
+    return resolver
+
 def validate_zone_file(domain):
     """
     Validate the integrity of a DNS zone file for a given domain.
@@ -39,18 +75,22 @@ def validate_zone_file(domain):
     }
     
     for path in zone_file_paths:
-        if os.path.exists(path):
-            result['path'] = path
-            cmd = f"named-checkzone {domain} {path}"
-            try:
-                zone_check = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-                if zone_check.returncode == 0:
-                    result['valid'] = True
-                    break
-                else:
-                    result['errors'].append(zone_check.stderr.strip())
-            except Exception as e:
-                result['errors'].append(str(e))
+        try:
+            os.stat(path)
+        except FileNotFoundError:
+            continue
+        
+        result['path'] = path
+        try:
+            zone_check = subprocess.run(['named-checkzone', domain, path],
+                                        capture_output=True, text=True)
+            if zone_check.returncode == 0:
+                result['valid'] = True
+                break
+            else:
+                result['errors'].append(zone_check.stderr.strip())
+        except Exception as e:
+            result['errors'].append(str(e))
     
     if not result['valid']:
         logging.error(f"Zone file validation failed for {domain}: {result['errors']}")
@@ -68,8 +108,8 @@ def reload_zone(domain):
         tuple: (success: bool, message: str)
     """
     try:
-        cmd = f"whmapi1 reloadzones domains={domain}"
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        result = subprocess.run(['whmapi1', 'reloadzones', f"domains={domain}"],
+                                capture_output=True, text=True)
         if result.returncode != 0:
             logging.error(f"Failed to reload zone {domain}: {result.stderr}")
             return False, f"Failed to reload zone {domain}: {result.stderr}"
@@ -103,32 +143,31 @@ def backup_zone_file(domain):
         f"/var/named/data/{domain}.db"
     ]
     
-    source_path = None
-    for path in zone_file_paths:
-        if os.path.exists(path):
-            source_path = path
-            break
-    
-    if not source_path:
-        backup_result['error'] = "Zone file not found"
-        return backup_result
-    
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_path = f"{source_path}.backup.{timestamp}"
     
-    try:
-        import shutil
-        shutil.copy2(source_path, backup_path)
+    # Copy the first zone file that exists; a missing source just moves on
+    # to the next candidate
+    for source_path in zone_file_paths:
+        backup_path = f"{source_path}.backup.{timestamp}"
+        try:
+            # copyfile uses the kernel's zero-copy path (sendfile) on Linux
+            shutil.copyfile(source_path, backup_path)
+        except FileNotFoundError:
+            continue
+        except Exception as e:
+            backup_result['error'] = str(e)
+            logging.error(f"Failed to backup zone file for {domain}: {e}")
+            return backup_result
+        
         backup_result.update({
             'success': True,
             'source_path': source_path,
             'backup_path': backup_path
         })
         logging.info(f"Backed up zone file for {domain}: {backup_path}")
-    except Exception as e:
-        backup_result['error'] = str(e)
-        logging.error(f"Failed to backup zone file for {domain}: {e}")
+        return backup_result
     
+    backup_result['error'] = "Zone file not found"
     return backup_result
 
 def get_bind_serial(domain_name):
@@ -142,8 +181,7 @@ def get_bind_serial(domain_name):
         str: SOA serial number from BIND, or None if not found
     """
     try:
-        resolver = dns.resolver.Resolver()
-        resolver.nameservers = ['127.0.0.1']
+        resolver = _get_resolver('127.0.0.1', 2.0, 3.0)
         if not domain_name.endswith('.'):
             domain_name += '.'
         answers = resolver.resolve(domain_name, dns.rdatatype.SOA)
@@ -174,10 +212,7 @@ def get_pdns_serial(domain_name):
     try:
         if not domain_name.endswith('.'):
             domain_name += '.'
-        resolver = dns.resolver.Resolver()
-        resolver.nameservers = [settings['masterns']]
-        resolver.timeout = 5.0
-        resolver.lifetime = 5.0
+        resolver = _get_resolver(settings['masterns'], 5.0, 5.0)
         answers = resolver.resolve(domain_name, dns.rdatatype.SOA)
         for rdata in answers:
             serial = str(rdata.serial)
@@ -237,7 +272,12 @@ def check_zone_sync(domain_name):
         'details': f"Checking synchronization status for {domain_name}"
     }
     
+    # The two lookups are independent network round-trips; query PowerDNS
+    # in the background while BIND is queried here
+    pdns_future = _get_serial_executor().submit(get_pdns_serial, domain_name)
     bind_serial = get_bind_serial(domain_name)
+    pdns_serial = pdns_future.result()
+    
     result['bind_serial'] = bind_serial
     if bind_serial is None:
         result['sync_status'] = 'error'
@@ -245,7 +285,6 @@ def check_zone_sync(domain_name):
         result['details'] = result['error_message']
         return result
     
-    pdns_serial = get_pdns_serial(domain_name)
     result['pdns_serial'] = pdns_serial
     if pdns_serial is None:
         result['sync_status'] = 'error'
@@ -303,23 +342,27 @@ def fix_soa_drift(domain_name, bind_serial, pdns_serial, dryrun=True):
         new_serial = max(bind_serial_int, pdns_serial_int) + 1
         new_serial_str = str(new_serial)
         
-        zone_file_path = f"/var/named/{domain_name}.db"
-        if not os.path.exists(zone_file_path):
-            zone_file_path = f"/var/named/data/{domain_name}.db"
-            if not os.path.exists(zone_file_path):
-                return False, f"Zone file for {domain_name} not found"
-        
-        cmd = f"dig @127.0.0.1 {domain_name} SOA +short"
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        if result.returncode != 0 or not result.stdout.strip():
-            return False, f"Failed to retrieve SOA record: {result.stderr}"
+        for zone_file_path in (f"/var/named/{domain_name}.db",
+                               f"/var/named/data/{domain_name}.db"):
+            try:
+                os.stat(zone_file_path)
+                break
+            except FileNotFoundError:
+                continue
+        else:
+            return False, f"Zone file for {domain_name} not found"
         
-        soa_parts = result.stdout.strip().split()
-        if len(soa_parts) < 7:
-            return False, f"Invalid SOA record format: {result.stdout}"
+        # Read the current SOA from local BIND
+        try:
+            answers = _get_resolver('127.0.0.1', 2.0, 3.0).resolve(
+                domain_name if domain_name.endswith('.') else f"{domain_name}.",
+                dns.rdatatype.SOA)
+            soa = answers[0]
+        except (dns.exception.DNSException, IndexError) as e:
+            return False, f"Failed to retrieve SOA record: {e}"
         
-        primary_ns = soa_parts[0]
-        email = soa_parts[1]
+        primary_ns = soa.mname.to_text()
+        email = soa.rname.to_text()
         refresh = "86400"   # 24 hours
         retry = "7200"      # 2 hours
         expire = "3600000"  # ~41.7 days
@@ -330,15 +373,17 @@ def fix_soa_drift(domain_name, bind_serial, pdns_serial, dryrun=True):
             logging.info(f"[Dry-run] New SOA record: {domain_name}. 86400 IN SOA {primary_ns} {email} {new_serial_str} {refresh} {retry} {expire} {minimum}")
             return True, f"Would update SOA serial from {bind_serial} to {new_serial_str}"
         
-        cmd = f"whmapi1 edit_zone_record domain={domain_name} " \
-              f"class=IN type=SOA " \
-              f"line=\"{domain_name}. 86400 IN SOA {primary_ns} {email} {new_serial_str} {refresh} {retry} {expire} {minimum}\""
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        cmd = [
+            'whmapi1', 'edit_zone_record', f"domain={domain_name}",
+            'class=IN', 'type=SOA',
+            f"line={domain_name}. 86400 IN SOA {primary_ns} {email} {new_serial_str} {refresh} {retry} {expire} {minimum}"
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
         if result.returncode != 0:
             return False, f"Failed to update SOA record: {result.stderr}"
         
-        cmd = f"whmapi1 reloadzones domains={domain_name}"
-        subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        subprocess.run(['whmapi1', 'reloadzones', f"domains={domain_name}"],
+                       capture_output=True, text=True)
         
         logging.info(f"Updated SOA serial for {domain_name} from {bind_serial} to {new_serial_str}")
         return True, f"Updated SOA serial from {bind_serial} to {new_serial_str}"
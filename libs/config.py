@@ -6,9 +6,12 @@
 # Version: 3.3
 
 import os
+import re
 import sys
-import configparser
+import socket
+import functools
 import subprocess
+from types import MappingProxyType
 
 # Constants
 SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -17,19 +20,120 @@ CONFIG_FILE = os.path.join(SCRIPT_DIR, 'config.ini')
 # Singleton pattern for config
 _config_instance = None
 
+# Read-only copy of the [Settings] section, taken once config.ini is loaded
+_settings_section = None
+
+# Matches either a "[section]" header or a "key = value" line. Lines starting
+# with '#' or ';' are comments and blank lines never match.
+_INI_LINE_RE = re.compile(
+    r'^[ \t]*(?:\[([^\]]+)\]|([^#;\s=:][^=:\n]*?)[ \t]*[=:][ \t]*(.*?))[ \t]*$',
+    re.MULTILINE
+)
+
+# Sentinel distinguishing "no fallback given" from a fallback of None
+_UNSET = object()
+
+# Cached settings dictionary (see get_settings)
+_settings_instance = None
+
+
+class IniConfig:
+    """
+    Minimal INI file reader for config.ini
+
+    Supports the subset of configparser used by dnssync: flat key = value
+    pairs grouped in sections, with full-line comments. Option names are
+    case-insensitive; there is no interpolation and no multiline values.
+    """
+
+    BOOLEAN_STATES = {
+        '1': True, 'yes': True, 'true': True, 'on': True,
+        '0': False, 'no': False, 'false': False, 'off': False
+    }
+
+    def __init__(self):
+        self._sections = {}
+
+    def read(self, filename):
+        """Parse an INI file if it exists, merging its sections into this config"""
+        try:
+            with open(filename, 'r') as f:
+                self.read_string(f.read())
+        except FileNotFoundError:
+            pass
+
+    def read_string(self, text):
+        """Parse INI formatted text, merging its sections into this config"""
+        section = None
+        for match in _INI_LINE_RE.finditer(text):
+            header, key, value = match.groups()
+            if header is not None:
+                section = self._sections.setdefault(header.strip(), {})
+            elif section is not None:
+                section[key.lower()] = value
+
+    def sections(self):
+        """Return the list of section names"""
+        return list(self._sections)
+
+    def options(self, section):
+        """Return the (lowercase) option names of a section, or [] if it is missing"""
+        return list(self._sections.get(section, {}))
+
+    def has_option(self, section, option):
+        """Check whether an option exists in a section"""
+        return option.lower() in self._sections.get(section, {})
+
+    def get(self, section, option, fallback=_UNSET):
+        """
+        Get an option value as a string
+
+        Raises:
+            KeyError: If the option is missing and no fallback was given
+        """
+        try:
+            return self._sections[section][option.lower()]
+        except KeyError:
+            if fallback is _UNSET:
+                raise KeyError(f"No option '{option}' in section '{section}'")
+            return fallback
+
+    def getint(self, section, option, fallback=_UNSET):
+        """Get an option value converted to an integer"""
+        value = self.get(section, option, fallback=_UNSET if fallback is _UNSET else None)
+        if value is None:
+            return fallback
+        return int(value)
+
+    def getboolean(self, section, option, fallback=_UNSET):
+        """Get an option value converted to a boolean"""
+        value = self.get(section, option, fallback=_UNSET if fallback is _UNSET else None)
+        if value is None:
+            return fallback
+        try:
+            return self.BOOLEAN_STATES[value.lower()]
+        except KeyError:
+            raise ValueError(f"Not a boolean: {value}")
+
+    def __getitem__(self, section):
+        return self._sections[section]
+
+    def __contains__(self, section):
+        return section in self._sections
+
 
 def get_config():
     """
     Load configuration from config.ini file
 
     Returns:
-        configparser.ConfigParser: Configuration object
+        IniConfig: Configuration object
     """
-    global _config_instance
+    global _config_instance, _settings_section
 
     if _config_instance is None:
         # Load configuration
-        _config_instance = configparser.ConfigParser()
+        _config_instance = IniConfig()
         _config_instance.read(CONFIG_FILE)
 
         # Validate required settings
@@ -43,10 +147,10 @@ def get_config():
             'masterns'
         ]
 
-        missing_settings = []
-        for setting in required_settings:
-            if not _config_instance.has_option('Settings', setting):
-                missing_settings.append(setting)
+        # One lookup of the section's options, then set membership per key
+        present = set(_config_instance.options('Settings'))
+        missing_settings = [setting for setting in required_settings
+                            if setting not in present]
 
         if missing_settings:
             missing_str = ', '.join(missing_settings)
@@ -55,87 +159,191 @@ def get_config():
             sys.stderr.write("Please check your config.ini file\n")
             sys.exit(1)
 
+        _settings_section = MappingProxyType(dict(_config_instance['Settings']))
+
     return _config_instance
 
 
-def get_server_ip():
-    """Get the primary server IP address"""
-    return subprocess.getoutput('hostname -I').strip().split()[0]
+def _parse_boolean(value):
+    """Convert an INI boolean string such as 'yes' or 'off' to a bool"""
+    try:
+        return IniConfig.BOOLEAN_STATES[value.lower()]
+    except KeyError:
+        raise ValueError(f"Not a boolean: {value}")
+
+
+def get_settings_section():
+    """
+    Get the [Settings] section of config.ini as a read-only mapping
+
+    Option names are lowercase. Lookups are plain dict lookups, so hot
+    paths don't go through the config reader.
+
+    Returns:
+        mappingproxy: Option name to raw string value
+    """
+    if _settings_section is None:
+        get_config()
+    return _settings_section
+
 
+@functools.lru_cache(maxsize=1)
+def get_server_ip():
+    """
+    Get the primary server IP address
 
+    Loopback addresses are never returned, as with 'hostname -I'. If the
+    hostname doesn't resolve to a usable address, the source address of the
+    default route is used, then 'hostname -I' itself.
+    """
+    try:
+        addresses = socket.gethostbyname_ex(socket.gethostname())[2]
+    except OSError:
+        addresses = []
+    for address in addresses:
+        if not address.startswith('127.'):
+            return address
+    
+    # Connecting a UDP socket sends nothing; it only selects the source
+    # address the kernel would route through
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.connect(('192.0.2.1', 9))
+            address = sock.getsockname()[0]
+        if not address.startswith(('127.', '0.')):
+            return address
+    except OSError:
+        pass
+    
+    addresses = subprocess.getoutput('hostname -I').split()
+    return addresses[0] if addresses else ''
+
+
+@functools.lru_cache(maxsize=1)
+def get_fqdn():
+    """Get the fully qualified hostname of this server"""
+    return socket.getfqdn()
+
+
+@functools.lru_cache(maxsize=1)
 def parse_nameservers():
     """
     Parse nameserver configuration from config.ini
 
+    The result is computed once and cached; config.ini does not change
+    during a run.
+
     Returns:
-        tuple: Contains primary_ns and secondary_ns lists of sorted nameservers
+        tuple: Contains primary_ns and secondary_ns tuples of sorted nameservers
     """
-    config = get_config()
+    section = get_settings_section()
 
     # Parse primary nameservers
-    primary_ns_str = config.get('Settings', 'nameservers')
-    primary_ns = sorted(
+    primary_ns_str = section['nameservers']
+    primary_ns = tuple(sorted(
         ns.strip().lower().rstrip('.') for ns in primary_ns_str.split(',')
-    )
+    ))
 
     # Parse secondary nameservers
     default_secondary = ('ns1.servercentralen.net,ns2.servercentralen.net,'
                          'ns3.servercentralen.net,ns4.servercentralen.net')
-    secondary_ns_str = config.get(
-        'Settings', 'secondary_nameservers', fallback=default_secondary)
-    secondary_ns = sorted([
+    secondary_ns_str = section.get('secondary_nameservers', default_secondary)
+    secondary_ns = tuple(sorted(
         ns.strip().lower() for ns in secondary_ns_str.split(',') if ns.strip()
-    ])
+    ))
 
     return primary_ns, secondary_ns
 
 
+@functools.lru_cache(maxsize=1)
 def get_excluded_domains():
-    """Get domains excluded from synchronization"""
-    config = get_config()
-    excluded_str = config.get('Settings', 'excluded_domains', fallback='')
-    return {d.strip().lower() for d in excluded_str.split(',') if d.strip()}
+    """Get domains excluded from synchronization (cached)"""
+    excluded_str = get_settings_section().get('excluded_domains', '')
+    return frozenset(
+        d.strip().lower() for d in excluded_str.split(',') if d.strip())
+
+
+def _get_cpanel_hostname():
+    """Get the cPanel hostname from config.ini, defaulting to this server's FQDN"""
+    return get_settings_section().get('cpanel_hostname') or get_fqdn()
+
+
+# Settings that need a host lookup, computed only when first read
+_LAZY_SETTINGS = {
+    'server_ip': get_server_ip,
+    'cpanel_hostname': _get_cpanel_hostname,
+}
+
+
+class _Settings(dict):
+    """
+    Settings dictionary that fills in _LAZY_SETTINGS keys on first lookup
+
+    Callers that never read server_ip or cpanel_hostname (e.g. the PowerDNS
+    API client) don't pay for the host lookups. Lazy keys appear in
+    keys() and items() only once they have been read.
+    """
+
+    def __missing__(self, key):
+        try:
+            loader = _LAZY_SETTINGS[key]
+        except KeyError:
+            raise KeyError(key) from None
+        value = self[key] = loader()
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or key in _LAZY_SETTINGS
 
 
 def get_settings():
     """
     Get all configuration settings as a dictionary
 
+    The settings are computed on the first call and cached for the rest
+    of the process; config.ini does not change during a run.
+
     Returns:
-        dict: Configuration settings with defaults applied
+        dict: Configuration settings with defaults applied; server_ip and
+            cpanel_hostname are resolved on first access
     """
-    config = get_config()
+    global _settings_instance
+
+    if _settings_instance is not None:
+        return _settings_instance
+
+    section = get_settings_section()
 
     # Get filesystem paths
-    active_zones_file = config.get('Settings', 'active_zones_file')
-    remove_zones_file = config.get('Settings', 'remove_zones_file')
-    orphans_file = config.get('Settings', 'orphans_file',
-                              fallback=os.path.join(SCRIPT_DIR, 'orphans.txt'))
-    log_file = config.get('Settings', 'log_file')
+    active_zones_file = section['active_zones_file']
+    remove_zones_file = section['remove_zones_file']
+    orphans_file = section.get('orphans_file',
+                               os.path.join(SCRIPT_DIR, 'orphans.txt'))
+    log_file = section['log_file']
 
     # Get PowerDNS settings
-    pdns_api_url = config.get('Settings', 'pdns_api_url').rstrip('/')
-    pdns_api_key = config.get('Settings', 'pdns_api_key')
+    pdns_api_url = section['pdns_api_url'].rstrip('/')
+    pdns_api_key = section['pdns_api_key']
 
     # Get nameserver configuration
     primary_ns, secondary_ns = parse_nameservers()
-    masterns = config.get('Settings', 'masterns')
+    masterns = section['masterns']
 
     # Get excluded domains
     excluded_domains = get_excluded_domains()
 
-    # Get cPanel hostname
-    hostname_cmd = subprocess.getoutput('hostname -f').strip()
-    cpanel_hostname = config.get('Settings', 'cpanel_hostname',
-                                 fallback=hostname_cmd)
-
     # Get sync settings
-    enable_bidirectional = config.getboolean(
-        'Settings', 'enable_bidirectional', fallback=True)
-    max_soa_drift = config.getint(
-        'Settings', 'max_soa_drift', fallback=5)
+    enable_bidirectional = _parse_boolean(
+        section.get('enable_bidirectional', 'yes'))
+    max_soa_drift = int(section.get('max_soa_drift', 5))
 
-    return {
+    _settings_instance = _Settings({
         'active_zones_file': active_zones_file,
         'remove_zones_file': remove_zones_file,
         'orphans_file': orphans_file,
@@ -146,11 +354,11 @@ def get_settings():
         'secondary_ns': secondary_ns,
         'masterns': masterns,
         'excluded_domains': excluded_domains,
-        'cpanel_hostname': cpanel_hostname,
         'enable_bidirectional': enable_bidirectional,
-        'max_soa_drift': max_soa_drift,
-        'server_ip': get_server_ip()
-    }
+        'max_soa_drift': max_soa_drift
+    })
+
+    return _settings_instance
 
 
 # Function to validate command-line arguments
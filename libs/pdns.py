@@ -7,9 +7,74 @@
 
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from .config import get_settings
 
+# orjson is optional; it encodes request bodies straight to bytes, much
+# faster than the standard library for large zone payloads. Both loads
+# accept bytes, so responses can be decoded from response.content.
+try:
+    import orjson
+    
+    _json_encode = orjson.dumps
+    _json_decode = orjson.loads
+except ImportError:
+    def _json_encode(obj):
+        """Serialize an object to UTF-8 encoded JSON"""
+        return json.dumps(obj).encode()
+    
+    _json_decode = json.loads
+
+# (connect, read) timeout in seconds for PowerDNS API requests
+PDNS_TIMEOUT = (3.05, 30)
+
+# Shared HTTP session (see get_session); keeps connections to the API alive
+_session = None
+
+# Zone URL with a '{}' placeholder for the zone name (see _get_zone_url_template)
+_zone_url_template = None
+
+def _get_zone_url_template():
+    """Build the zone URL template from the configured API URL on first use"""
+    global _zone_url_template
+    
+    if _zone_url_template is None:
+        api_url = get_settings()['pdns_api_url']
+        _zone_url_template = f"{api_url}/api/v1/servers/localhost/zones/{{}}"
+    return _zone_url_template
+
+def get_session():
+    """
+    Get the shared session for PowerDNS API requests
+    
+    The session carries the API key and JSON content type headers and
+    reuses pooled keep-alive connections across calls. Connection errors
+    and gateway errors on idempotent requests are retried with backoff.
+    
+    Returns:
+        requests.Session: Configured session
+    """
+    global _session
+    
+    if _session is None:
+        settings = get_settings()
+        session = requests.Session()
+        session.headers.update({
+            'X-API-Key': settings['pdns_api_key'],
+            'Content-Type': 'application/json'
+        })
+        retry = Retry(total=3, backoff_factor=0.1, status_forcelist=(502, 503, 504))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=32, max_retries=retry)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _session = session
+    
+    return _session
+
 def pdns_req(method, domain, data=None):
     """
     Make a request to the PowerDNS API
@@ -20,18 +85,20 @@ def pdns_req(method, domain, data=None):
         data (dict, optional): JSON data to send with the request
         
     Returns:
-        requests.Response or None: API response or None on error
+        requests.Response or None: API response, or None on error, timeout
+            or once retries are exhausted
     """
-    settings = get_settings()
-    headers = {'X-API-Key': settings['pdns_api_key'], 'Content-Type': 'application/json'}
-    
     # Ensure domain has trailing dot for API
-    domain_with_dot = domain if domain.endswith('.') else f"{domain}."
+    domain_with_dot = domain if domain[-1:] == '.' else domain + '.'
     
-    url = f"{settings['pdns_api_url']}/api/v1/servers/localhost/zones/{domain_with_dot}"
+    url = _get_zone_url_template().format(domain_with_dot)
+    
+    # Serialize here rather than via json=; the session sends the
+    # JSON content type header
+    body = None if data is None else _json_encode(data)
     
     try:
-        response = requests.request(method, url, headers=headers, json=data)
+        response = get_session().request(method, url, data=body, timeout=PDNS_TIMEOUT)
         if response.status_code >= 400 and response.status_code != 404:
             logging.error(f"PowerDNS API error: {response.status_code} - {response.text}")
         return response
@@ -52,33 +119,99 @@ def disconnect_zone_from_cpanel(domain, dryrun=False):
     """
     # Retrieve current zone data
     response = pdns_req('GET', domain)
-    if response and response.ok:
-        zone_data = response.json()
-    else:
+    if response is None or not 200 <= response.status_code < 300:
         logging.error(f"Failed to retrieve zone data for {domain}")
         return False
     
+    if dryrun:
+        logging.info(f"[Dry-run] Would disconnect zone {domain} from cPanel")
+        return True
+    
+    zone_data = _json_decode(response.content)
+    
     # Update zone data to disconnect from cPanel
     updated_zone_data = {
         'name': zone_data['name'],
         'kind': 'Native',  # Change zone kind to Native
         'masters': [],     # Remove any masters
         'metadata': [
-            item for item in zone_data.get('metadata', [])
-            if item['kind'].startswith('X-DNSSEC')  # Keep only DNSSEC metadata
+            item for item in zone_data.get('metadata') or ()
+            if item['kind'][:8] == 'X-DNSSEC'  # Keep only DNSSEC metadata
         ]
     }
     
-    if dryrun:
-        logging.info(f"[Dry-run] Would disconnect zone {domain} from cPanel: {json.dumps(updated_zone_data)}")
-        return True
-    
     # Update zone with the changes
     response = pdns_req('PUT', domain, updated_zone_data)
-    if response and response.ok:
+    if response is not None and 200 <= response.status_code < 300:
         logging.info(f"Disconnected zone {domain} from cPanel in PowerDNS")
         return True
     else:
         logging.error(f"Failed to disconnect zone {domain} from cPanel: {getattr(response, 'text', 'N/A')}")
         return False
 
+def patch_zone_rrsets(domain, rrsets, dryrun=False):
+    """
+    Apply several record set changes to a zone in one API request
+    
+    PowerDNS accepts any number of rrset changes in a single PATCH, so
+    callers should collect a zone's changes and send them together
+    rather than making one request per record.
+    
+    Args:
+        domain (str): Domain name of the zone
+        rrsets (list): PowerDNS rrset objects, each with name, type and
+            changetype (REPLACE or DELETE) and, for REPLACE, ttl and records
+        dryrun (bool): If True, only log what would be done
+        
+    Returns:
+        bool: True if successful, dry run, or nothing to change; False on error
+    """
+    if not rrsets:
+        return True
+    
+    if dryrun:
+        logging.info(f"[Dry-run] Would apply {len(rrsets)} rrset changes to {domain}: {json.dumps(rrsets)}")
+        return True
+    
+    response = pdns_req('PATCH', domain, {'rrsets': rrsets})
+    if response is not None and response.status_code == 204:
+        logging.info(f"Applied {len(rrsets)} rrset changes to {domain}")
+        return True
+    else:
+        logging.error(f"Failed to update rrsets for {domain}: {getattr(response, 'text', 'N/A')}")
+        return False
+
+def disconnect_zones_from_cpanel(domains, dryrun=False, max_workers=16):
+    """
+    Disconnect several zones from cPanel in PowerDNS concurrently
+    
+    Each zone is handled by disconnect_zone_from_cpanel on a worker
+    thread; the threads share the session's connection pool.
+    
+    Args:
+        domains (iterable): Domain names to disconnect
+        dryrun (bool): If True, only log what would be done
+        max_workers (int): Maximum number of concurrent API requests
+        
+    Returns:
+        dict: Domain name to True if disconnected (or dry run), False on error
+    """
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(disconnect_zone_from_cpanel, domain, dryrun): domain
+            for domain in domains
+        }
+        for future in as_completed(futures):
+            domain = futures[future]
+            try:
+                results[domain] = future.result()
+            except Exception as e:
+                logging.error(f"Failed to disconnect zone {domain} from cPanel: {e}")
+                results[domain] = False
+    
+    failed = sum(1 for ok in results.values() if not ok)
+    if failed:
+        logging.warning(f"Failed to disconnect {failed} of {len(results)} zones from cPanel")
+    
+    return results
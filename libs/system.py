@@ -5,21 +5,228 @@
 # Description: Server environment detection and system interaction
 # Version: 3.3
 
+import re
 import json
+import asyncio
 import logging
 import subprocess
 import ipaddress
 import socket
+import struct
 import os
+import mmap
+import time
+import functools
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List, Tuple, Any, Optional
+from pathlib import Path
+from typing import Dict, List, Tuple, Any, Optional, Sequence
 
+# Timeout in seconds for the version and service probe commands
+PROBE_TIMEOUT = 5
+
+# Nameserver entries in /etc/resolv.conf
+_NAMESERVER_RE = re.compile(rb'^[ \t]*nameserver[ \t]+(\S+)', re.MULTILINE)
+
+# orjson is optional; it serializes the saved state straight to bytes and
+# parses whmapi1 output from bytes. Its decode errors subclass
+# json.JSONDecodeError.
+try:
+    import orjson
+    
+    def _json_encode(obj) -> bytes:
+        """Serialize an object to indented UTF-8 encoded JSON"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    
+    _json_decode = orjson.loads
+except ImportError:
+    def _json_encode(obj) -> bytes:
+        """Serialize an object to indented UTF-8 encoded JSON"""
+        return json.dumps(obj, indent=2).encode()
+    
+    orjson = None
+    _json_decode = json.loads
+
+# State files at least this large are parsed from a memory map when orjson
+# is available, instead of being read into memory first
+STATE_MMAP_THRESHOLD = 64 * 1024
+
+# psutil is optional; without it addresses are read from `ip -o addr`
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# get_cpanel_server_info results are reused for this many seconds, so one
+# state collection doesn't run the same whmapi1 commands several times
+CPANEL_INFO_TTL = 60
+_cpanel_info_cache = {'time': 0.0, 'data': None}
+
+def _build_query(qname: str, qtype: int, qclass: int = 1) -> bytes:
+    """Build a recursive DNS query packet for a single question"""
+    header = struct.pack('!HHHHHH', 0x1234, 0x0100, 1, 0, 0, 0)
+    labels = b''.join(bytes([len(label)]) + label.encode() for label in qname.split('.') if label)
+    return header + labels + b'\x00' + struct.pack('!HH', qtype, qclass)
+
+# Reachability probe: a CHAOS TXT query for version.bind, which any DNS
+# server answers in one UDP round trip, if only with REFUSED
+_PROBE_QUERY = _build_query('version.bind', 16, 3)
+
+# Resolution test for local BIND in validate_services: an A query that
+# must come back with at least one answer
+_BIND_TEST_QUERY = _build_query('google.com', 1)
+BIND_TEST_TIMEOUT = 2
+
+# Shared HTTP session for the PowerDNS API check (see _get_session); keeps
+# the connection alive between health checks
+_session = None
+
+# Probes are independent, so they run on a shared pool (see _get_executor)
+_executor = None
+_executor_lock = threading.Lock()
+
+# Commands run by this module, as argv tuples built once at import
+_CMD_SHARED_IP = ('whmapi1', 'get_shared_ip', '--output=json')
+_CMD_GETHOSTNAME = ('whmapi1', 'gethostname', '--output=json')
+_CMD_HOSTNAME_IPS = ('hostname', '-I')
+_CMD_HOSTNAME_FQDN = ('hostname', '-f')
+_CMD_IP_ADDRS = ('ip', '-4', '-o', 'addr', 'show')
+_CMD_BIND_STATUS = ('systemctl', 'is-active', 'named')
+_CMD_DNS_STATUS = ('systemctl', 'is-active', 'named', 'pdns')
+
+# Version probes: key -> (command, parser for its combined output). The OS
+# probe is only run if /etc/redhat-release can't be read.
+_VERSION_PROBES = {
+    'os': (('lsb_release', '-d'), lambda out: out.replace('Description:', '').strip()),
+    'cpanel': (('/usr/local/cpanel/cpanel', '-V'), lambda out: out.strip()),
+    'bind': (('named', '-v'), lambda out: out.split('BIND')[1].strip()),
+    'pdns': (('pdns_server', '--version'), lambda out: out.split('PowerDNS')[1].strip())
+}
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Get the shared thread pool used for concurrent system probes"""
+    global _executor
+    
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='system-probe')
+    return _executor
+
+def _run(cmd: Sequence[str]) -> str:
+    """
+    Run a command without a shell and return its output
+    
+    Like subprocess.getoutput, stderr is merged into stdout and a trailing
+    newline is removed.
+    
+    Raises:
+        OSError: If the command can't be run
+        subprocess.TimeoutExpired: If it runs longer than PROBE_TIMEOUT
+    """
+    result = subprocess.run(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        text=True, timeout=PROBE_TIMEOUT
+    )
+    return result.stdout.rstrip('\n')
+
+class _DNSReplyProtocol(asyncio.DatagramProtocol):
+    """Resolve `reply` to the first datagram, or None on an ICMP error"""
+    
+    def __init__(self):
+        self.reply = asyncio.get_running_loop().create_future()
+    
+    def datagram_received(self, data, addr):
+        if not self.reply.done():
+            self.reply.set_result(data)
+    
+    def error_received(self, exc):
+        if not self.reply.done():
+            self.reply.set_result(None)
+
+async def _query(host: str, query: bytes, timeout: float) -> Optional[bytes]:
+    """Send a DNS query over UDP and return the reply, or None if none came within timeout"""
+    loop = asyncio.get_running_loop()
+    try:
+        transport, protocol = await loop.create_datagram_endpoint(
+            _DNSReplyProtocol, remote_addr=(host, 53))
+    except OSError:
+        return None
+    try:
+        transport.sendto(query)
+        return await asyncio.wait_for(protocol.reply, timeout)
+    except asyncio.TimeoutError:
+        return None
+    finally:
+        transport.close()
+
+async def _probe(host: str, timeout: float) -> bool:
+    """Check whether a DNS server answers a UDP query within timeout"""
+    return await _query(host, _PROBE_QUERY, timeout) is not None
+
+def _probe_dns(hosts: List[str], timeout: float = 1) -> List[bool]:
+    """
+    Check several DNS servers concurrently on one event loop
+    
+    Each server is sent a single UDP query; any reply, even a refusal,
+    counts as reachable. All probes share the timeout, so the call takes
+    at most `timeout` seconds however many servers are unreachable.
+    
+    Returns:
+        list: True for each host that answered
+    """
+    async def probe_all():
+        return await asyncio.gather(*(_probe(host, timeout) for host in hosts))
+    return asyncio.run(probe_all())
+
+def _bind_resolves(host: str = '127.0.0.1') -> bool:
+    """Check whether a DNS server returns answers for _BIND_TEST_QUERY"""
+    reply = asyncio.run(_query(host, _BIND_TEST_QUERY, BIND_TEST_TIMEOUT))
+    if reply is None or len(reply) < 12 or reply[:2] != _BIND_TEST_QUERY[:2]:
+        return False
+    rcode = reply[3] & 0x0F
+    ancount = (reply[6] << 8) | reply[7]
+    return rcode == 0 and ancount > 0
+
+def _get_session() -> requests.Session:
+    """Get the shared session used by validate_services"""
+    global _session
+    
+    if _session is None:
+        session = requests.Session()
+        session.headers.update({'Accept': 'application/json'})
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=4)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _session = session
+    
+    return _session
+
+def _whmapi1(cmd: Sequence[str]) -> Optional[Dict[str, Any]]:
+    """
+    Run a whmapi1 command with JSON output
+    
+    Returns:
+        dict or None: The response's data, or None if the call failed
+    """
+    try:
+        result = subprocess.run(cmd, capture_output=True, timeout=PROBE_TIMEOUT)
+        response = _json_decode(result.stdout)
+    except (OSError, subprocess.TimeoutExpired, json.JSONDecodeError):
+        return None
+    if response.get("result", {}).get("status") != 1:
+        return None
+    return response.get("data", {})
+
+@functools.lru_cache(maxsize=1)
 def get_server_ip() -> str:
     """
     Get the primary server IP address using most reliable method
     Replaces implementation in config.py
     
+    The result is cached for the process lifetime (see invalidate_env_cache).
+    
     Returns:
         str: Server IP address
     """
@@ -29,13 +236,16 @@ def get_server_ip() -> str:
         return cpanel_info.get('server_ip')
     
     # Fall back to hostname -I for compatibility
-    return subprocess.getoutput('hostname -I').strip().split()[0]
+    return _run(_CMD_HOSTNAME_IPS).strip().split()[0]
     
+@functools.lru_cache(maxsize=1)
 def get_cpanel_hostname() -> str:
     """
     Get the FQDN of the cPanel server
     Replaces config.get('Settings', 'cpanel_hostname', fallback=...)
     
+    The result is cached for the process lifetime (see invalidate_env_cache).
+    
     Returns:
         str: Server FQDN
     """
@@ -45,38 +255,47 @@ def get_cpanel_hostname() -> str:
         return cpanel_info.get('hostname')
     
     # Fall back to hostname -f for compatibility
-    return subprocess.getoutput('hostname -f').strip()
+    return _run(_CMD_HOSTNAME_FQDN).strip()
+
+def invalidate_env_cache() -> None:
+    """Forget the cached server IP, hostname and cPanel server info"""
+    get_server_ip.cache_clear()
+    get_cpanel_hostname.cache_clear()
+    _cpanel_info_cache['data'] = None
 
 def get_cpanel_server_info() -> Dict[str, str]:
     """
     Retrieve server identification via cPanel API
     
+    Results are cached for CPANEL_INFO_TTL seconds.
+    
     Returns:
         dict: Server information including IP and hostname
     """
+    cached = _cpanel_info_cache['data']
+    if cached is not None and time.monotonic() - _cpanel_info_cache['time'] < CPANEL_INFO_TTL:
+        return dict(cached)
+    
+    # Both whmapi1 commands start a Perl interpreter, so run them side by side
+    executor = _get_executor()
+    ip_future = executor.submit(_whmapi1, _CMD_SHARED_IP)
+    host_future = executor.submit(_whmapi1, _CMD_GETHOSTNAME)
+    
     data = {}
     
     # Get main IP address (more reliable than hostname -I)
-    ip_cmd = "whmapi1 get_shared_ip --output=json"
-    ip_result = subprocess.getoutput(ip_cmd)
-    try:
-        ip_data = json.loads(ip_result)
-        if ip_data.get("result", {}).get("status") == 1:
-            data["server_ip"] = ip_data.get("data", {}).get("ip")
-    except json.JSONDecodeError:
-        pass
-
+    ip_data = ip_future.result()
+    if ip_data is not None:
+        data["server_ip"] = ip_data.get("ip")
+    
     # Get FQDN (more reliable than hostname -f)
-    host_cmd = "whmapi1 gethostname --output=json"
-    host_result = subprocess.getoutput(host_cmd)
-    try:
-        host_data = json.loads(host_result)
-        if host_data.get("result", {}).get("status") == 1:
-            data["hostname"] = host_data.get("data", {}).get("hostname")
-    except json.JSONDecodeError:
-        pass
-        
-    return data
+    host_data = host_future.result()
+    if host_data is not None:
+        data["hostname"] = host_data.get("hostname")
+    
+    _cpanel_info_cache['time'] = time.monotonic()
+    _cpanel_info_cache['data'] = data
+    return dict(data)
 
 def get_system_state() -> Dict[str, Any]:
     """
@@ -93,6 +312,31 @@ def get_system_state() -> Dict[str, Any]:
     }
     return state
 
+def _global_ipv4_addresses() -> List[str]:
+    """
+    List the publicly routable IPv4 addresses of all interfaces
+    
+    Uses psutil.net_if_addrs() when available, otherwise a single
+    `ip -4 -o addr show` without a shell.
+    """
+    if psutil is not None:
+        addresses = [
+            snic.address
+            for snics in psutil.net_if_addrs().values()
+            for snic in snics
+            if snic.family == socket.AF_INET
+        ]
+    else:
+        # One line per address: "<index>: <ifname> inet <ip>/<prefix> ..."
+        addresses = []
+        for line in _run(_CMD_IP_ADDRS).splitlines():
+            parts = line.split()
+            if len(parts) > 3 and parts[2] == 'inet':
+                addresses.append(parts[3].split('/', 1)[0])
+    
+    # Filter out private IPs
+    return [ip for ip in addresses if ipaddress.ip_address(ip).is_global]
+
 def get_network_state() -> Dict[str, Any]:
     """
     Get network configuration details
@@ -105,25 +349,16 @@ def get_network_state() -> Dict[str, Any]:
     # Get active IPs
     ips = []
     try:
-        ip_output = subprocess.getoutput("ip -4 addr show | grep -w inet").splitlines()
-        for line in ip_output:
-            parts = line.strip().split()
-            if len(parts) > 1:
-                ip_cidr = parts[1]
-                if '/' in ip_cidr:
-                    ip = ip_cidr.split('/')[0]
-                    if ipaddress.ip_address(ip).is_global:  # Filter out private IPs
-                        ips.append(ip)
+        ips = _global_ipv4_addresses()
     except Exception as e:
-        logging.warning(f"Error getting network interfaces: {e}")
+        logging.warning("Error getting network interfaces: %s", e)
     
     # DNS resolver configuration
     resolvers = []
     try:
-        with open('/etc/resolv.conf', 'r') as f:
-            for line in f:
-                if line.startswith('nameserver'):
-                    resolvers.append(line.split()[1])
+        with open('/etc/resolv.conf', 'rb') as f:
+            data = f.read()
+        resolvers = [ns.decode() for ns in _NAMESERVER_RE.findall(data)]
     except Exception:
         pass
     
@@ -138,41 +373,29 @@ def get_version_info() -> Dict[str, str]:
     """
     Get version information for relevant components
     
+    The version commands run concurrently.
+    
     Returns:
         dict: Version information
     """
     versions = {}
+    probes = dict(_VERSION_PROBES)
     
     # Get OS version
     try:
-        with open('/etc/redhat-release', 'r') as f:
-            versions['os'] = f.read().strip()
-    except:
+        versions['os'] = Path('/etc/redhat-release').read_text().strip()
+        del probes['os']
+    except OSError:
+        pass
+    
+    executor = _get_executor()
+    futures = {executor.submit(_run, cmd): key for key, (cmd, _) in probes.items()}
+    for future in as_completed(futures):
+        key = futures[future]
         try:
-            versions['os'] = subprocess.getoutput('lsb_release -d').replace('Description:', '').strip()
+            versions[key] = probes[key][1](future.result())
         except:
-            versions['os'] = 'Unknown'
-    
-    # Get cPanel version
-    try:
-        cp_version = subprocess.getoutput('/usr/local/cpanel/cpanel -V')
-        versions['cpanel'] = cp_version.strip()
-    except:
-        versions['cpanel'] = 'Unknown'
-    
-    # Get BIND version
-    try:
-        bind_version = subprocess.getoutput('named -v').split('BIND')[1].strip()
-        versions['bind'] = bind_version
-    except:
-        versions['bind'] = 'Unknown'
-    
-    # Get PowerDNS version
-    try:
-        pdns_version = subprocess.getoutput('pdns_server --version 2>&1').split('PowerDNS')[1].strip()
-        versions['pdns'] = pdns_version
-    except:
-        versions['pdns'] = 'Unknown'
+            versions[key] = 'Unknown'
     
     return versions
 
@@ -180,41 +403,50 @@ def get_service_state() -> Dict[str, bool]:
     """
     Get state of required services
     
+    The service status and reachability checks run concurrently.
+    
     Returns:
         dict: Service state information
     """
-    services = {}
+    # This would be replaced with actual configuration
+    master_dns = '1.2.3.4'  # Placeholder - should be from settings
     
-    # Check if BIND is running
-    try:
-        bind_status = subprocess.getoutput('systemctl is-active named')
-        services['bind'] = bind_status == 'active'
-    except:
-        services['bind'] = False
+    executor = _get_executor()
+    # Check if master DNS answers queries, while systemctl runs
+    master_future = executor.submit(lambda: _probe_dns([master_dns])[0])
+    
+    services = {}
     
-    # Check if PowerDNS is running
+    # Check if BIND and PowerDNS are running, with one systemctl call that
+    # prints a status line per unit
     try:
-        pdns_status = subprocess.getoutput('systemctl is-active pdns')
-        services['pdns'] = pdns_status == 'active'
+        result = subprocess.run(_CMD_DNS_STATUS, capture_output=True, text=True, timeout=PROBE_TIMEOUT)
+        states = result.stdout.splitlines()
     except:
-        services['pdns'] = False
+        states = []
+    services['bind'] = len(states) > 0 and states[0].strip() == 'active'
+    services['pdns'] = len(states) > 1 and states[1].strip() == 'active'
     
-    # Check if master DNS is reachable
     try:
-        # This would be replaced with actual configuration
-        master_dns = '1.2.3.4'  # Placeholder - should be from settings
-        
-        # Try to connect to DNS port
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(1)
-        result = sock.connect_ex((master_dns, 53))
-        services['master_reachable'] = (result == 0)
-        sock.close()
+        services['master_reachable'] = master_future.result()
     except:
         services['master_reachable'] = False
     
     return services
 
+# (section, key) pairs of the system state compared by check_environment_drift
+DRIFT_FIELDS = (
+    ('network', 'primary_ip'),
+    ('network', 'hostname'),
+    ('versions', 'os'),
+    ('versions', 'cpanel'),
+    ('versions', 'bind'),
+    ('versions', 'pdns'),
+    ('services', 'bind'),
+    ('services', 'pdns'),
+    ('services', 'master_reachable')
+)
+
 def check_environment_drift(stored_state: Dict[str, Any], current_state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Compare stored environment state with current to detect drift
@@ -226,46 +458,36 @@ def check_environment_drift(stored_state: Dict[str, Any], current_state: Optiona
     Returns:
         dict: Drift analysis with detected changes
     """
-    if not current_state:
+    if current_state is None:
         current_state = get_system_state()
     
     if not stored_state:
         return {'status': 'no_previous_state', 'changes': []}
     
-    changes = []
+    # Usually nothing changed; whole-section equality is a single C-level
+    # comparison, so only walk individual fields when a section differs
+    if all(stored_state.get(section) == current_state.get(section)
+           for section in ('network', 'versions', 'services')):
+        return {
+            'status': 'unchanged',
+            'changes': [],
+            'last_check': current_state.get('timestamp')
+        }
     
-    # Check network changes
-    if stored_state.get('network', {}).get('primary_ip') != current_state.get('network', {}).get('primary_ip'):
-        changes.append({
-            'component': 'network.primary_ip',
-            'previous': stored_state.get('network', {}).get('primary_ip'),
-            'current': current_state.get('network', {}).get('primary_ip')
-        })
-    
-    if stored_state.get('network', {}).get('hostname') != current_state.get('network', {}).get('hostname'):
-        changes.append({
-            'component': 'network.hostname',
-            'previous': stored_state.get('network', {}).get('hostname'),
-            'current': current_state.get('network', {}).get('hostname')
-        })
-    
-    # Check version changes
-    for version_key in ['os', 'cpanel', 'bind', 'pdns']:
-        if stored_state.get('versions', {}).get(version_key) != current_state.get('versions', {}).get(version_key):
+    changes = []
+    for section, key in DRIFT_FIELDS:
+        previous = (stored_state.get(section) or {}).get(key)
+        current = (current_state.get(section) or {}).get(key)
+        if previous != current:
             changes.append({
-                'component': f'versions.{version_key}',
-                'previous': stored_state.get('versions', {}).get(version_key),
-                'current': current_state.get('versions', {}).get(version_key)
+                'component': f'{section}.{key}',
+                'previous': previous,
+                'current': current
             })
     
-    # Check service state changes
-    for service_key in ['bind', 'pdns', 'master_reachable']:
-        if stored_state.get('services', {}).get(service_key) != current_state.get('services', {}).get(service_key):
-            changes.append({
-                'component': f'services.{service_key}',
-                'previous': stored_state.get('services', {}).get(service_key),
-                'current': current_state.get('services', {}).get(service_key)
-            })
+    # The server's identity may have changed with it
+    if changes:
+        invalidate_env_cache()
     
     return {
         'status': 'drift_detected' if changes else 'unchanged',
@@ -284,23 +506,26 @@ def save_environment_state(state_file, state=None):
     Returns:
         bool: True if successful, False otherwise
     """
-    if not state:
+    if state is None:
         state = get_system_state()
     
     try:
         # Create directory if it doesn't exist
         os.makedirs(os.path.dirname(state_file), exist_ok=True)
         
-        # Use atomic write pattern
+        # Use atomic write pattern; the data is on disk before the rename,
+        # so a crash can't leave an empty state file behind
         temp_file = f"{state_file}.tmp"
-        with open(temp_file, 'w') as f:
-            json.dump(state, f, indent=2)
+        with open(temp_file, 'wb') as f:
+            f.write(_json_encode(state))
+            f.flush()
+            os.fsync(f.fileno())
         
         # Replace original file
-        os.rename(temp_file, state_file)
+        os.replace(temp_file, state_file)
         return True
     except Exception as e:
-        logging.error(f"Failed to save environment state: {e}")
+        logging.error("Failed to save environment state: %s", e)
         return False
 
 def load_environment_state(state_file):
@@ -315,19 +540,24 @@ def load_environment_state(state_file):
     """
     try:
         if os.path.exists(state_file):
-            with open(state_file, 'r') as f:
-                return json.load(f)
+            with open(state_file, 'rb') as f:
+                if orjson is not None and os.fstat(f.fileno()).st_size >= STATE_MMAP_THRESHOLD:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                        return orjson.loads(view)
+                return _json_decode(f.read())
     except Exception as e:
-        logging.error(f"Failed to load environment state: {e}")
+        logging.error("Failed to load environment state: %s", e)
     
     return {}
 
-def validate_services(settings: Dict[str, Any]) -> Tuple[bool, List[str]]:
+def validate_services(settings: Dict[str, Any], fast_fail: bool = False) -> Tuple[bool, List[str]]:
     """
     Verify required services before attempting zone operations
     
     Args:
         settings (dict): Configuration settings
+        fast_fail (bool): If True, stop at the first failed check instead of
+            running them all; for callers that only need a yes/no
     
     Returns:
         tuple: (is_valid, errors) where is_valid is bool and errors is list
@@ -336,26 +566,25 @@ def validate_services(settings: Dict[str, Any]) -> Tuple[bool, List[str]]:
     
     # Check BIND service
     try:
-        bind_status = subprocess.getoutput('systemctl is-active named')
+        bind_status = _run(_CMD_BIND_STATUS)
         if bind_status != 'active':
             errors.append(f"BIND service not running (status: {bind_status})")
             
         # Test if BIND is responding to queries
-        bind_test = subprocess.run(
-            'dig @127.0.0.1 +short google.com',
-            shell=True, capture_output=True, text=True
-        )
-        if bind_test.returncode != 0 or not bind_test.stdout.strip():
+        if not _bind_resolves():
             errors.append("BIND not responding to DNS queries")
     except Exception as e:
         errors.append(f"Error checking BIND service: {e}")
     
+    if fast_fail and errors:
+        return False, errors
+    
     # Check PowerDNS API accessibility
     if settings.get('pdns_api_url') and settings.get('pdns_api_key'):
         try:
-            headers = {'X-API-Key': settings['pdns_api_key'], 'Accept': 'application/json'}
-            response = requests.get(f"{settings['pdns_api_url']}/api/v1/servers/localhost", 
-                                  headers=headers, timeout=5)
+            headers = {'X-API-Key': settings['pdns_api_key']}
+            response = _get_session().get(f"{settings['pdns_api_url']}/api/v1/servers/localhost", 
+                                          headers=headers, timeout=5)
             
             if response.status_code != 200:
                 errors.append(f"PowerDNS API error: HTTP {response.status_code}")
@@ -364,15 +593,14 @@ def validate_services(settings: Dict[str, Any]) -> Tuple[bool, List[str]]:
     else:
         errors.append("PowerDNS API settings missing (pdns_api_url or pdns_api_key)")
     
+    if fast_fail and errors:
+        return False, errors
+    
     # Check MasterNS reachability
     if settings.get('masterns'):
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(1)
-            result = sock.connect_ex((settings['masterns'], 53))
-            if result != 0:
+            if not _probe_dns([settings['masterns']])[0]:
                 errors.append(f"MasterNS server unreachable: {settings['masterns']}")
-            sock.close()
         except Exception as e:
             errors.append(f"Error checking MasterNS reachability: {e}")
     else:
@@ -7,133 +7,167 @@
 
 import os
 import sys
+import io
 import csv
-from datetime import datetime
+import time
+import argparse
+from multiprocessing import Pool
 
 # Add parent directory to sys.path
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, parent_dir)
 
-from dnssync_lib.db_manager import DatabaseManager
+from dnssync_lib.db_manager import DatabaseManager, timestamp_from_text
 from dnssync_lib.config import get_settings
+from dnssync_lib.utils import read_file_lines
 
-def migrate_active_zones():
-    """Migrate active zones file to database"""
-    settings = get_settings()
-    active_zones_file = settings['active_zones_file']
-    
-    if not os.path.exists(active_zones_file):
-        print(f"Active zones file not found: {active_zones_file}")
-        return 0
-    
-    db = DatabaseManager()
-    tracking = db.load_domain_tracking()
-    
-    # Read active zones
-    migrated = 0
-    with open(active_zones_file, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#'):
-                domain = line.lower()
-                if domain not in tracking:
-                    tracking[domain] = {
-                        "status": "active",
-                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    }
-                    migrated += 1
-                elif tracking[domain]["status"] != "active":
-                    tracking[domain]["status"] = "active"
-                    tracking[domain]["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    migrated += 1
-    
-    db.save_domain_tracking(tracking)
-    return migrated
+def split_file(path, parts):
+    """
+    Split a file into up to `parts` [start, end) byte ranges
+    
+    Every range except the last ends just after a newline, so no line is
+    split between two ranges.
+    """
+    size = os.path.getsize(path)
+    ranges = []
+    start = 0
+    with open(path, 'rb') as f:
+        for part in range(1, parts + 1):
+            if start >= size:
+                break
+            end = size * part // parts
+            if end <= start:
+                continue
+            if end < size:
+                # Move the boundary to the end of the line it falls in
+                f.seek(end)
+                f.readline()
+                end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
 
-def migrate_removed_zones():
-    """Migrate removed zones file to database"""
-    settings = get_settings()
-    remove_zones_file = settings['remove_zones_file']
-    
-    if not os.path.exists(remove_zones_file):
-        print(f"Removed zones file not found: {remove_zones_file}")
-        return 0
-    
-    db = DatabaseManager()
-    tracking = db.load_domain_tracking()
-    
-    # Read removed zones
-    migrated = 0
-    with open(remove_zones_file, 'r') as f:
-        reader = csv.reader(f)
-        for row in reader:
-            if len(row) >= 2:
-                domain = row[0].strip().lower()
-                timestamp = row[1].strip()
-                if domain not in tracking:
-                    tracking[domain] = {
-                        "status": "inactive",
-                        "timestamp": timestamp
-                    }
-                    migrated += 1
-                elif tracking[domain]["status"] != "inactive":
-                    tracking[domain]["status"] = "inactive"
-                    tracking[domain]["timestamp"] = timestamp
-                    migrated += 1
-    
-    db.save_domain_tracking(tracking)
-    return migrated
+def read_zone_range(task):
+    """Return the normalized domains in a (path, start, end) byte range of a zone list"""
+    path, start, end = task
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    
+    return [stripped.decode() for stripped in (line.strip() for line in data.lower().splitlines())
+            if stripped and not stripped.startswith(b'#')]
 
-def migrate_orphans():
-    """Migrate orphaned domains file to database"""
-    settings = get_settings()
-    orphans_file = settings.get('orphans_file')
-    
-    if not orphans_file or not os.path.exists(orphans_file):
-        print(f"Orphans file not found: {orphans_file}")
-        return 0
-    
-    db = DatabaseManager()
-    tracking = db.load_domain_tracking()
-    
-    # Read orphaned domains
-    migrated = 0
-    with open(orphans_file, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#'):
-                domain = line.lower()
-                if domain not in tracking:
-                    tracking[domain] = {
-                        "status": "orphan",
-                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    }
-                    migrated += 1
-                elif tracking[domain]["status"] != "orphan":
-                    tracking[domain]["status"] = "orphan"
-                    tracking[domain]["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    migrated += 1
-    
-    db.save_domain_tracking(tracking)
+def read_zone_list(path, status, workers=1):
+    """Yield (domain, status, timestamp) rows from a plain zone list file"""
+    # All domains in one run share the same timestamp
+    now = int(time.time())
+    
+    if workers <= 1:
+        # Read the file in one pass, then stream rows to the caller
+        for line in read_file_lines(path):
+            yield line.lower(), status, now
+        return
+    
+    # Normalize byte ranges of the file in worker processes; the parent
+    # only streams the results into the database
+    tasks = [(path, start, end) for start, end in split_file(path, workers)]
+    with Pool(min(workers, len(tasks) or 1)) as pool:
+        for domains in pool.imap_unordered(read_zone_range, tasks):
+            for domain in domains:
+                yield domain, status, now
+
+def read_removed_zones(path, status, workers=1):
+    """
+    Yield (domain, status, timestamp) rows from the removed zones CSV file
+    
+    Always read in this process; each row needs its timestamp parsed and
+    the file is small compared to the zone lists.
+    """
+    with open(path, 'r', newline='') as f:
+        data = f.read()
+    for row in csv.reader(io.StringIO(data)):
+        if len(row) >= 2:
+            yield row[0].strip().lower(), status, timestamp_from_text(row[1].strip())
+
+# Status -> (settings key, description, row reader), in migration order
+MIGRATIONS = {
+    'active': ('active_zones_file', 'Active zones', read_zone_list),
+    'inactive': ('remove_zones_file', 'Removed zones', read_removed_zones),
+    'orphan': ('orphans_file', 'Orphans', read_zone_list),
+}
+
+def migrate_all(db, files_by_status, workers=1, force=False):
+    """
+    Migrate the zone files for each status to the database
+    
+    A file whose mtime and size are unchanged since it was last migrated
+    into this database is skipped.
+    
+    Args:
+        db (DatabaseManager): Database to migrate into
+        files_by_status (dict): Status -> path of the file listing its domains
+        workers (int): Number of processes used to read each zone list
+        force (bool): Migrate every file, even if unchanged
+        
+    Returns:
+        dict: Status -> number of domains inserted or changed
+    """
+    migrated = {}
+    for status, path in files_by_status.items():
+        _, description, reader = MIGRATIONS[status]
+        try:
+            st = os.stat(path) if path else None
+        except FileNotFoundError:
+            st = None
+        if st is None:
+            print(f"{description} file not found: {path}")
+            migrated[status] = 0
+            continue
+        
+        path = os.path.abspath(path)
+        if not force and db.is_migrated(path, st.st_mtime_ns, st.st_size):
+            print(f"{description} file unchanged since last migration: {path}")
+            migrated[status] = 0
+            continue
+        
+        migrated[status] = db.upsert_domains(
+            reader(path, status, workers), source=(path, st.st_mtime_ns, st.st_size))
     return migrated
 
+def parse_arguments():
+    """Parse command-line arguments for the migration script"""
+    parser = argparse.ArgumentParser(
+        description="Migrate file-based domain tracking to the SQLite database")
+    parser.add_argument(
+        '--parallel', type=int, nargs='?', const=os.cpu_count() or 1, default=1,
+        metavar='WORKERS',
+        help="Read zone lists with several processes (default: one per CPU)")
+    parser.add_argument(
+        '--force', action='store_true',
+        help="Migrate every file, even if unchanged since the last migration")
+    return parser.parse_args()
+
 def main():
     """Main migration function"""
+    args = parse_arguments()
+    
     print("Starting migration of domain tracking data...")
     
-    # Migrate active zones
-    active_migrated = migrate_active_zones()
-    print(f"Migrated {active_migrated} active domains")
+    settings = get_settings()
+    files_by_status = {
+        status: settings.get(setting)
+        for status, (setting, _, _) in MIGRATIONS.items()
+    }
     
-    # Migrate removed zones
-    removed_migrated = migrate_removed_zones()
-    print(f"Migrated {removed_migrated} inactive domains")
+    db = DatabaseManager()
+    migrated = migrate_all(db, files_by_status, args.parallel, force=args.force)
+    db.close()
     
-    # Migrate orphaned domains
-    orphans_migrated = migrate_orphans()
-    print(f"Migrated {orphans_migrated} orphaned domains")
+    print(f"Migrated {migrated['active']} active domains")
+    print(f"Migrated {migrated['inactive']} inactive domains")
+    print(f"Migrated {migrated['orphan']} orphaned domains")
     
-    total_migrated = active_migrated + removed_migrated + orphans_migrated
+    total_migrated = sum(migrated.values())
     print(f"Migration complete. Total domains migrated: {total_migrated}")
 
 if __name__ == "__main__":
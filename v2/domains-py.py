@@ -7,13 +7,168 @@
 
 import os
 import json
+import heapq
 import logging
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from .config import get_settings
 from .pdns import remove_zone_from_pdns
-from .zones import check_zone_sync, fix_soa_drift
+from .zones import (check_zone_sync, check_zones_sync, clear_zone_file_cache,
+                    fix_soa_drift, flush_soa_cache)
+
+# cPanel API output is parsed straight from the subprocess bytes; orjson
+# is optional and much faster on multi-MB listzones/listaccts payloads.
+# Its decode errors subclass json.JSONDecodeError.
+try:
+    from orjson import loads as _json_decode
+except ImportError:
+    _json_decode = json.loads
+
+# Parsed tracking files: path -> ((st_mtime_ns, st_size), {domain: (timestamp, status)}).
+# A file whose mtime and size are unchanged since it was last read or
+# written is not read again.
+_tracking_cache = {}
+
+# Directories already created or found by _ensure_dir in this process
+_dirs_ensured = set()
+
+def _ensure_dir(directory):
+    """Create a directory if needed, at most once per process"""
+    if directory not in _dirs_ensured:
+        os.makedirs(directory, exist_ok=True)
+        _dirs_ensured.add(directory)
+
+def _parse_active_zones(text, now):
+    """Parse active zones file lines of the form domain[,timestamp[,status]]"""
+    entries = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        
+        # Parse line with format domain,timestamp,status
+        parts = line.split(',', 3)
+        if len(parts) >= 3:
+            entries[parts[0]] = (parts[1], parts[2])
+        elif len(parts) == 2:
+            # Handle older format with just domain,timestamp
+            entries[parts[0]] = (parts[1], "active")
+        else:
+            # Default for domains with no timestamp
+            entries[parts[0]] = (now, "active")
+    return entries
+
+def _parse_remove_zones(text, now):
+    """Parse remove zones file lines of the form domain,timestamp"""
+    entries = {}
+    for line in text.splitlines():
+        parts = line.strip().split(',', 2)
+        if len(parts) >= 2:
+            entries[parts[0]] = (parts[1], "inactive")
+    return entries
+
+def _parse_orphans(text, now):
+    """Parse orphans file lines of the form domain[,timestamp]"""
+    entries = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        
+        parts = line.split(',', 2)
+        if len(parts) >= 2:
+            entries[parts[0]] = (parts[1], "orphan")
+        else:
+            # Default for domains with no timestamp
+            entries[parts[0]] = (now, "orphan")
+    return entries
+
+def _read_tracking_file(path, parse, now):
+    """
+    Parse a tracking file, reusing the cached result if it is unchanged
+    
+    Returns:
+        dict or None: domain -> (timestamp, status), or None if the file doesn't exist
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _tracking_cache.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    
+    # Read the file in one go and split it into lines in bulk
+    with open(path, 'r') as f:
+        entries = parse(f.read(), now)
+    _tracking_cache[path] = (key, entries)
+    return entries
+
+class DomainTracker:
+    """
+    Domain tracking state, indexed by status
+    
+    Each status bucket maps domain -> timestamp and status_of maps each
+    domain to its status, so status changes are O(1) and saving writes
+    the buckets out without scanning every domain.
+    """
+    __slots__ = ('active', 'inactive', 'orphan', 'status_of')
+    
+    STATUSES = ('active', 'inactive', 'orphan')
+    
+    def __init__(self):
+        self.active = {}
+        self.inactive = {}
+        self.orphan = {}
+        self.status_of = {}
+    
+    def __len__(self):
+        return len(self.status_of)
+    
+    def __contains__(self, domain):
+        return domain in self.status_of
+    
+    def get(self, domain):
+        """
+        Get a domain's tracking information
+        
+        Returns:
+            tuple or None: (timestamp, status), or None if the domain isn't tracked
+        """
+        status = self.status_of.get(domain)
+        if status is None:
+            return None
+        return getattr(self, status)[domain], status
+    
+    def set_status(self, domain, status, timestamp=None):
+        """
+        Move a domain to a status bucket, adding it if it isn't tracked
+        
+        Args:
+            domain (str): Domain name
+            status (str): One of STATUSES
+            timestamp (str, optional): New timestamp; by default a tracked
+                domain keeps its current one
+        """
+        if status not in self.STATUSES:
+            raise ValueError(f"Unknown domain status: {status}")
+        
+        old_status = self.status_of.get(domain)
+        if old_status is not None:
+            old_timestamp = getattr(self, old_status).pop(domain)
+            if timestamp is None:
+                timestamp = old_timestamp
+        
+        getattr(self, status)[domain] = timestamp
+        self.status_of[domain] = status
+    
+    def touch(self, domain, timestamp):
+        """Update the timestamp of a tracked domain"""
+        getattr(self, self.status_of[domain])[domain] = timestamp
 
 def load_domain_tracking():
     """
@@ -23,137 +178,70 @@ def load_domain_tracking():
     to construct a unified view of all domains' statuses.
     
     Returns:
-        dict: Dictionary with domain info in the format:
-        {
-            "domain.com": {
-                "timestamp": "2025-03-13 04:00:00",
-                "status": "active"
-            },
-            ...
-        }
+        DomainTracker: Tracked domains, bucketed by status
     """
     settings = get_settings()
-    domains = {}
+    tracker = DomainTracker()
+    
+    # Timestamp for entries that don't record one
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    active = _read_tracking_file(settings['active_zones_file'], _parse_active_zones, now)
     
     # Check that the file exists, create if it doesn't
-    if not os.path.exists(settings['active_zones_file']):
-        os.makedirs(os.path.dirname(settings['active_zones_file']), exist_ok=True)
+    if active is None:
+        _ensure_dir(os.path.dirname(settings['active_zones_file']))
         with open(settings['active_zones_file'], 'w') as f:
             pass
-        return domains
+        return tracker
     
-    # Read active zones file
-    with open(settings['active_zones_file'], 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Parse line with format domain,timestamp,status
-            parts = line.split(',')
-            if len(parts) >= 3:
-                domain, timestamp, status = parts[0], parts[1], parts[2]
-                domains[domain] = {
-                    "timestamp": timestamp,
-                    "status": status
-                }
-            elif len(parts) == 2:
-                # Handle older format with just domain,timestamp
-                domain, timestamp = parts[0], parts[1]
-                domains[domain] = {
-                    "timestamp": timestamp,
-                    "status": "active"
-                }
-            else:
-                # Default for domains with no timestamp
-                domain = parts[0]
-                domains[domain] = {
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "status": "active"
-                }
-    
-    # Also check remove zones file if it exists
-    if os.path.exists(settings['remove_zones_file']):
-        with open(settings['remove_zones_file'], 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line or ',' not in line:
-                    continue
-                
-                parts = line.split(',')
-                if len(parts) >= 2:
-                    domain, timestamp = parts[0], parts[1]
-                    domains[domain] = {
-                        "timestamp": timestamp,
-                        "status": "inactive"
-                    }
-    
-    # Check orphans file if it exists
-    if os.path.exists(settings['orphans_file']):
-        with open(settings['orphans_file'], 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                parts = line.split(',')
-                if len(parts) >= 2:
-                    domain, timestamp = parts[0], parts[1]
-                    domains[domain] = {
-                        "timestamp": timestamp,
-                        "status": "orphan"
-                    }
-                else:
-                    # Default for domains with no timestamp
-                    domain = parts[0]
-                    domains[domain] = {
-                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        "status": "orphan"
-                    }
-    
-    return domains
+    # Later files take precedence, as inactive or orphan entries
+    removed = _read_tracking_file(settings['remove_zones_file'], _parse_remove_zones, now)
+    orphans = _read_tracking_file(settings['orphans_file'], _parse_orphans, now)
+    
+    # Fill fresh buckets; callers modify them, the cache must not change.
+    # Entries with an unknown status were never saved back, so skip them.
+    for entries in (active, removed, orphans):
+        if entries:
+            for domain, (timestamp, status) in entries.items():
+                if status in DomainTracker.STATUSES:
+                    tracker.set_status(domain, status, timestamp)
+    
+    return tracker
 
-def save_domain_tracking(domains):
+def save_domain_tracking(tracker):
     """
     Save the domain tracking information to disk.
     
     Args:
-        domains: Dictionary with domain information
+        tracker (DomainTracker): Tracked domains
     """
     settings = get_settings()
     
+    files = (
+        (settings['active_zones_file'], 'active', tracker.active),
+        (settings['remove_zones_file'], 'inactive', tracker.inactive),
+        (settings['orphans_file'], 'orphan', tracker.orphan)
+    )
+    
     # Ensure directories exist
-    os.makedirs(os.path.dirname(settings['active_zones_file']), exist_ok=True)
-    os.makedirs(os.path.dirname(settings['remove_zones_file']), exist_ok=True)
-    os.makedirs(os.path.dirname(settings['orphans_file']), exist_ok=True)
-    
-    # Separate domains by status
-    active_domains = {}
-    inactive_domains = {}
-    orphan_domains = {}
-    
-    for domain, info in domains.items():
-        if info["status"] == "active":
-            active_domains[domain] = info
-        elif info["status"] == "inactive":
-            inactive_domains[domain] = info
-        elif info["status"] == "orphan":
-            orphan_domains[domain] = info
-    
-    # Write active domains
-    with open(settings['active_zones_file'], 'w') as f:
-        for domain, info in active_domains.items():
-            f.write(f"{domain},{info['timestamp']},{info['status']}\n")
-    
-    # Write inactive domains
-    with open(settings['remove_zones_file'], 'w') as f:
-        for domain, info in inactive_domains.items():
-            f.write(f"{domain},{info['timestamp']},{info['status']}\n")
-    
-    # Write orphan domains
-    with open(settings['orphans_file'], 'w') as f:
-        for domain, info in orphan_domains.items():
-            f.write(f"{domain},{info['timestamp']},{info['status']}\n")
+    for path, _, _ in files:
+        _ensure_dir(os.path.dirname(path))
+    
+    # Write each bucket with a single write() and replace the file
+    # atomically, so a crash never leaves a truncated tracking file
+    for path, status, bucket in files:
+        entries = {domain: (str(timestamp), status) for domain, timestamp in bucket.items()}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(''.join(
+                f"{domain},{timestamp},{status}\n" for domain, (timestamp, _) in entries.items()
+            ))
+        os.replace(tmp_path, path)
+        
+        # What was just written is what the next load would parse
+        st = os.stat(path)
+        _tracking_cache[path] = ((st.st_mtime_ns, st.st_size), entries)
 
 def load_active_zones():
     """
@@ -168,12 +256,43 @@ def load_active_zones():
         return set()
     
     with open(settings['active_zones_file']) as f:
-        domains = set()
-        for line in f:
-            parts = line.strip().split(',')
-            if parts:
-                domains.add(parts[0])
-        return domains
+        text = f.read()
+    
+    # Only the domain (first field) of each line is needed
+    return {line.split(',', 1)[0] for line in map(str.strip, text.splitlines()) if line}
+
+def _fetch_user_domains(user):
+    """
+    Get addon and parked domains for a cPanel user
+    
+    Args:
+        user (str): cPanel account name
+        
+    Returns:
+        tuple: (addon_domains, parked_domains) sets; both empty on error
+    """
+    try:
+        addon_cmd = subprocess.run(
+            ['uapi', f'--user={user}', 'DomainInfo', 'list_domains', '--output=json'],
+            capture_output=True
+        ).stdout
+        addon_data = _json_decode(addon_cmd)
+    except OSError as e:
+        logging.error(f"Error running uapi for user {user}: {e}")
+        return set(), set()
+    except json.JSONDecodeError as e:
+        logging.error(f"Error parsing addon domain data for user {user}: {e}")
+        return set(), set()
+    
+    # Partial responses are common (e.g. suspended or broken accounts), so
+    # look fields up with .get() rather than paying for KeyError
+    result = addon_data.get('result') or {}
+    if result.get('status') != 1:
+        return set(), set()
+    data = result.get('data') or {}
+    addon_domains = {d.lower().rstrip('.') for d in data.get('addon_domains') or ()}
+    parked_domains = {d.lower().rstrip('.') for d in data.get('parked_domains') or ()}
+    return addon_domains, parked_domains
 
 def get_affiliated_domains():
     """
@@ -185,49 +304,93 @@ def get_affiliated_domains():
     affiliated_domains = set()
 
     # Get all user accounts
-    account_cmd = subprocess.getoutput('whmapi1 listaccts --output=json')
     try:
-        account_data = json.loads(account_cmd)
-        accounts = [acc['user'] for acc in account_data['data']['acct'] if acc['suspended'] == 0]
-    except (json.JSONDecodeError, KeyError) as e:
+        account_cmd = subprocess.run(
+            ['whmapi1', 'listaccts', '--output=json'], capture_output=True
+        ).stdout
+        account_data = _json_decode(account_cmd)
+    except OSError as e:
+        logging.error(f"Error running whmapi1 listaccts: {e}")
+        return affiliated_domains
+    except json.JSONDecodeError as e:
         logging.error(f"Error parsing account data: {e}")
         return affiliated_domains
+    
+    acct = (account_data.get('data') or {}).get('acct')
+    if acct is None:
+        logging.error("Error parsing account data: no account list in listaccts output")
+        return affiliated_domains
+    accounts = [acc['user'] for acc in acct if acc.get('suspended') == 0 and 'user' in acc]
 
     logging.info(f"Found {len(accounts)} active user accounts")
 
     # Get main domains from listzones
-    zones_cmd = subprocess.getoutput('whmapi1 listzones --output=json')
     try:
-        zones_data = json.loads(zones_cmd)
-        main_domains = {z['domain'].lower().rstrip('.') for z in zones_data['data']['zone']}
-        affiliated_domains.update(main_domains)
-        logging.info(f"Found {len(main_domains)} main domains from listzones")
-    except (json.JSONDecodeError, KeyError) as e:
+        zones_cmd = subprocess.run(
+            ['whmapi1', 'listzones', '--output=json'], capture_output=True
+        ).stdout
+        zones_data = _json_decode(zones_cmd)
+    except OSError as e:
+        logging.error(f"Error running whmapi1 listzones: {e}")
+        zones_data = None
+    except json.JSONDecodeError as e:
         logging.error(f"Error parsing zone data: {e}")
+        zones_data = None
+    
+    if zones_data is not None:
+        zones = (zones_data.get('data') or {}).get('zone')
+        if zones is None:
+            logging.error("Error parsing zone data: no zone list in listzones output")
+        else:
+            main_domains = {z['domain'].lower().rstrip('.') for z in zones if z.get('domain')}
+            affiliated_domains.update(main_domains)
+            logging.info(f"Found {len(main_domains)} main domains from listzones")
 
-    # Get addon domains for each account
+    # Get addon domains for each account; uapi calls block on a child
+    # process, so run them from a thread pool
     total_addons = 0
-    for user in accounts:
-        addon_cmd = subprocess.getoutput(f'uapi --user={user} DomainInfo list_domains --output=json')
-        try:
-            addon_data = json.loads(addon_cmd)
-            if addon_data['result']['status'] == 1:
-                # Add addon domains
-                addon_domains = {d.lower().rstrip('.') for d in addon_data['result']['data']['addon_domains']}
+    if accounts:
+        with ThreadPoolExecutor(max_workers=min(32, len(accounts))) as executor:
+            for addon_domains, parked_domains in executor.map(_fetch_user_domains, accounts):
                 affiliated_domains.update(addon_domains)
-                total_addons += len(addon_domains)
-
-                # Add parked/aliased domains
-                parked_domains = {d.lower().rstrip('.') for d in addon_data['result']['data']['parked_domains']}
                 affiliated_domains.update(parked_domains)
-
-        except (json.JSONDecodeError, KeyError) as e:
-            logging.error(f"Error parsing addon domain data for user {user}: {e}")
+                total_addons += len(addon_domains)
 
     logging.info(f"Found {total_addons} addon domains across all accounts")
 
     return affiliated_domains
 
+def _fast_timestamp(timestamp):
+    """
+    Parse a "%Y-%m-%d %H:%M:%S" timestamp
+    
+    The fixed-width fields are sliced out directly, which is much faster
+    than strptime; anything not in that exact layout falls back to
+    strptime.
+    
+    Raises:
+        ValueError: If the timestamp is not valid
+    """
+    if (len(timestamp) == 19 and timestamp[4] == '-' and timestamp[7] == '-' and
+            timestamp[10] == ' ' and timestamp[13] == ':' and timestamp[16] == ':'):
+        try:
+            return datetime(
+                int(timestamp[0:4]), int(timestamp[5:7]), int(timestamp[8:10]),
+                int(timestamp[11:13]), int(timestamp[14:16]), int(timestamp[17:19])
+            )
+        except ValueError:
+            pass
+    return datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
+
+def _parse_timestamp(timestamp):
+    """Parse a tracking timestamp, mapping missing or invalid values to datetime.min"""
+    try:
+        if timestamp:
+            return _fast_timestamp(timestamp)
+        return datetime.min
+    except (ValueError, TypeError):
+        return datetime.min
+
 def handle_removed_zones(dryrun=False):
     """
     Process domains marked for removal
@@ -243,40 +406,42 @@ def handle_removed_zones(dryrun=False):
     if not os.path.exists(settings['remove_zones_file']):
         return
     
-    with open(settings['remove_zones_file'], "r") as file:
-        lines = file.readlines()
+    path = settings['remove_zones_file']
+    tmp_path = path + '.tmp'
+    now = datetime.now()
     
-    updated_lines = []
-    for line in lines:
-        parts = line.strip().split(',')
-        if len(parts) < 2:
-            updated_lines.append(line)
-            continue
+    # Stream kept lines into a sibling file and swap it in atomically, so
+    # the list is never held in memory and a crash can't leave it torn
+    with open(path, "r") as src, open(tmp_path, "w", buffering=1 << 20) as dst:
+        for line in src:
+            parts = line.strip().split(',')
+            if len(parts) < 2:
+                dst.write(line)
+                continue
+                
+            domain = parts[0]
+            timestamp = parts[1]
             
-        domain = parts[0]
-        timestamp = parts[1]
-        
-        try:
-            domain_time = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
-        except ValueError:
-            # Try to parse as epoch time for backwards compatibility
             try:
-                domain_time = datetime.fromtimestamp(float(timestamp))
-            except (ValueError, TypeError):
-                updated_lines.append(line)
-                continue
-        
-        # Check if domain has been in removal state for more than 1 hour (3600 seconds)
-        if (datetime.now() - domain_time).total_seconds() > 3600:
-            logging.info(f"Domain {domain} has been marked for removal for more than 1 hour. Removing...")
-            if not dryrun:
-                remove_zone_from_pdns(domain, dryrun)
-        else:
-            updated_lines.append(line)
+                domain_time = _fast_timestamp(timestamp)
+            except ValueError:
+                # Try to parse as epoch time for backwards compatibility
+                try:
+                    domain_time = datetime.fromtimestamp(float(timestamp))
+                except (ValueError, TypeError, OverflowError, OSError):
+                    dst.write(line)
+                    continue
+            
+            # Check if domain has been in removal state for more than 1 hour (3600 seconds)
+            if (now - domain_time).total_seconds() > 3600:
+                logging.info(f"Domain {domain} has been marked for removal for more than 1 hour. Removing...")
+                if not dryrun:
+                    remove_zone_from_pdns(domain, dryrun)
+                    clear_zone_file_cache()
+            else:
+                dst.write(line)
     
-    # Write updated lines back to file
-    with open(settings['remove_zones_file'], "w") as file:
-        file.writelines(updated_lines)
+    os.replace(tmp_path, path)
 
 def process_domain_queue(max_domains=10, distribution=(4, 4, 2), dryrun=True):
     """
@@ -290,7 +455,7 @@ def process_domain_queue(max_domains=10, distribution=(4, 4, 2), dryrun=True):
     Returns:
         dict: Processing results including domains processed and status
     """
-    settings = get_settings()
+    max_soa_drift = get_settings()['max_soa_drift']
     
     results = {
         'total_processed': 0,
@@ -306,99 +471,88 @@ def process_domain_queue(max_domains=10, distribution=(4, 4, 2), dryrun=True):
     # Load domain tracking information
     domain_tracking = load_domain_tracking()
     
-    # Categorize domains
+    # Categorize domains straight from the status buckets, parsing each
+    # timestamp once into (timestamp, domain) pairs
     new_domains = []
     existing_domains = []
     orphan_domains = []
     
-    for domain, info in domain_tracking.items():
-        if info['status'] == 'active':
-            if info.get('timestamp') is None:
-                new_domains.append(domain)
-            else:
-                existing_domains.append(domain)
-        elif info['status'] == 'orphan':
-            orphan_domains.append(domain)
+    for domain, timestamp in domain_tracking.active.items():
+        if timestamp is None:
+            new_domains.append((datetime.min, domain))
+        else:
+            existing_domains.append((_parse_timestamp(timestamp), domain))
+    for domain, timestamp in domain_tracking.orphan.items():
+        orphan_domains.append((_parse_timestamp(timestamp), domain))
     
-    # Sort domains by timestamp (oldest first)
-    def get_timestamp(domain):
-        try:
-            timestamp = domain_tracking[domain].get('timestamp')
-            if timestamp:
-                return datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
-            return datetime.min
-        except (ValueError, TypeError):
-            return datetime.min
-    
-    new_domains.sort(key=get_timestamp)
-    existing_domains.sort(key=get_timestamp)
-    orphan_domains.sort(key=get_timestamp)
-    
-    # Process domains from each category
+    # Pick the oldest domains from each category up to its quota, without
+    # sorting whole categories or exceeding max_domains in total
     queue_types = [
         ('new', new_domains, distribution[0]),
         ('existing', existing_domains, distribution[1]),
         ('orphan', orphan_domains, distribution[2])
     ]
     
+    batch = []
     for queue_type, domains, quota in queue_types:
-        domains_to_process = domains[:quota]
-        
-        for domain in domains_to_process:
-            # Skip if we've reached the maximum
-            if results['total_processed'] >= max_domains:
+        for _, domain in heapq.nsmallest(quota, domains):
+            if len(batch) >= max_domains:
                 break
+            batch.append((queue_type, domain))
+    
+    # SOA checks are network-bound, so run them concurrently on one event
+    # loop. Results are handled below in batch order, so updates to
+    # domain_tracking and SOA fixes stay serial.
+    sync_statuses = check_zones_sync([domain for _, domain in batch])
+    
+    for (queue_type, domain), sync_status in zip(batch, sync_statuses):
+        logging.info(f"Processing {queue_type} domain: {domain}")
+        
+        # Update domain tracking information
+        domain_tracking.touch(domain, current_time)
+        
+        # Update status in results
+        results['total_processed'] += 1
+        
+        status = sync_status['sync_status']
+        if status == 'success':
+            results['success_count'] += 1
+        elif status == 'warning':
+            results['warning_count'] += 1
+        else:
+            results['error_count'] += 1
+        
+        domain_result = {
+            'domain': domain,
+            'status': status,
+            'message': sync_status.get('error_message')
+        }
+        results['domains'].append(domain_result)
+        
+        # Check for critical SOA drift and attempt to fix if needed
+        soa_drift = sync_status['soa_drift']
+        if status == 'error' and soa_drift and soa_drift > max_soa_drift:
+            logging.warning(f"Critical SOA drift detected for {domain}: {soa_drift}")
             
-            logging.info(f"Processing {queue_type} domain: {domain}")
-            
-            # Check synchronization status
-            sync_status = check_zone_sync(domain)
-            
-            # Update domain tracking information
-            domain_tracking[domain]['timestamp'] = current_time
-            
-            # Update status in results
-            results['total_processed'] += 1
-            
-            if sync_status['sync_status'] == 'success':
-                results['success_count'] += 1
-            elif sync_status['sync_status'] == 'warning':
-                results['warning_count'] += 1
-            else:
-                results['error_count'] += 1
-            
-            results['domains'].append({
-                'domain': domain,
-                'status': sync_status['sync_status'],
-                'message': sync_status.get('error_message')
-            })
+            # Attempt to fix SOA drift
+            success, message = fix_soa_drift(
+                domain, 
+                sync_status['bind_serial'], 
+                sync_status['pdns_serial'],
+                dryrun
+            )
             
-            # Check for critical SOA drift and attempt to fix if needed
-            if sync_status['sync_status'] == 'error' and sync_status['soa_drift'] and sync_status['soa_drift'] > settings['max_soa_drift']:
-                logging.warning(f"Critical SOA drift detected for {domain}: {sync_status['soa_drift']}")
-                
-                # Attempt to fix SOA drift
-                success, message = fix_soa_drift(
-                    domain, 
-                    sync_status['bind_serial'], 
-                    sync_status['pdns_serial'],
-                    dryrun
-                )
+            if success:
+                logging.info(f"Successfully fixed SOA drift for {domain}: {message}")
                 
-                if success:
-                    logging.info(f"Successfully fixed SOA drift for {domain}: {message}")
-                    
-                    if not dryrun:
-                        # Update status after fix
-                        updated_sync_status = check_zone_sync(domain)
-                        
-                        # Update results
-                        for result in results['domains']:
-                            if result['domain'] == domain:
-                                result['status'] = updated_sync_status['sync_status']
-                                result['message'] = updated_sync_status.get('error_message')
-                else:
-                    logging.error(f"Failed to fix SOA drift for {domain}: {message}")
+                if not dryrun:
+                    # Update status after fix, bypassing cached SOA answers
+                    flush_soa_cache(domain)
+                    updated_sync_status = check_zone_sync(domain)
+                    domain_result['status'] = updated_sync_status['sync_status']
+                    domain_result['message'] = updated_sync_status.get('error_message')
+            else:
+                logging.error(f"Failed to fix SOA drift for {domain}: {message}")
     
     # Save updated domain tracking information
     save_domain_tracking(domain_tracking)
@@ -7,8 +7,13 @@
 
 import os
 import logging
+from logging.handlers import MemoryHandler, RotatingFileHandler
 from .config import get_config
 
+# Records buffered before a write to the log file; ERROR and above are
+# written immediately
+LOG_BUFFER_CAPACITY = 1024
+
 def setup_logging(silent=False, show_log=False):
     """
     Set up logging configuration:
@@ -31,20 +36,32 @@ def setup_logging(silent=False, show_log=False):
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
     
-    # Clear any existing handlers
+    # Clear any existing handlers, flushing any buffered records
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
+        handler.close()
     
-    # Set up file logging (always enabled)
+    # Set up file logging (always enabled), rotated and written in batches.
+    # logging.shutdown() at exit flushes whatever is still buffered.
     os.makedirs(os.path.dirname(log_file), exist_ok=True)
-    file_handler = logging.FileHandler(log_file)
+    file_handler = RotatingFileHandler(
+        log_file,
+        maxBytes=10*1024*1024,  # 10MB
+        backupCount=5,
+        delay=True
+    )
     file_formatter = logging.Formatter(
         '[%(levelname)s] %(asctime)s: %(message)s', 
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     file_handler.setFormatter(file_formatter)
-    file_handler.setLevel(log_level)
-    root_logger.addHandler(file_handler)
+    buffered_handler = MemoryHandler(
+        LOG_BUFFER_CAPACITY,
+        flushLevel=logging.ERROR,
+        target=file_handler
+    )
+    buffered_handler.setLevel(log_level)
+    root_logger.addHandler(buffered_handler)
     
     # Set up console logging (if not silent)
     if not silent:
@@ -64,29 +81,29 @@ def create_module_logger(module_name):
     """
     Create a module-specific logger
     
+    Records propagate to the root logger, so the handlers configured by
+    setup_logging apply without being copied to each module logger.
+    
     Args:
         module_name (str): Name of the module
     
     Returns:
-        logging.Logger: Configured logger for the module
+        logging.Logger: Logger for the module
     """
-    logger = logging.getLogger(module_name)
-    
-    # If no handlers, use root logger's configuration
-    if not logger.handlers:
-        # Prevent propagation to root logger
-        logger.propagate = False
-        
-        # Add handlers from root logger
-        root_logger = logging.getLogger()
-        for handler in root_logger.handlers:
-            logger.addHandler(handler)
+    return logging.getLogger(module_name)
+
+def set_module_level(module_name, level):
+    """
+    Override the log level of a single module's logger
     
-    return logger
+    Args:
+        module_name (str): Name of the module
+        level (int): Logging level, e.g. logging.DEBUG
+    """
+    logging.getLogger(module_name).setLevel(level)
 
 # Potential future improvements
-# Todo 1: Add support for log rotation
-# Todo 2: Implement configurable log formats
-# Todo 3: Create method for log level adjustment during runtime
-# Todo 4: Add more detailed contextual logging
-# Todo 5: Implement secure log file permissions
+# Todo 1: Implement configurable log formats
+# Todo 2: Create method for log level adjustment during runtime
+# Todo 3: Add more detailed contextual logging
+# Todo 4: Implement secure log file permissions
@@ -5,14 +5,123 @@
 # Description: SOA record operations for DNS Sync
 # Version: 3.3
 
+import os
+import time
 import logging
+import functools
+import threading
 import subprocess 
 
+import dns.name
+import dns.rdataclass
+import dns.rdatatype
 import dns.resolver
 import dns.exception
 
 from .config import get_settings
 
+# SOA serials are unsigned 32-bit numbers compared per RFC 1982
+SERIAL_MASK = 0xFFFFFFFF
+SERIAL_HALF = 0x80000000
+
+# Resolvers are cached per thread and nameserver (see _get_resolver);
+# check_zone_sync may run on several threads at once
+_resolver_local = threading.local()
+
+# Answer caches shared by all threads' resolvers, one per nameserver since
+# dnspython cache keys don't include the server. Entries expire with the
+# record TTL; see flush_soa_cache for forcing a fresh lookup.
+SOA_CACHE_SIZE = 10000
+_soa_caches = {}
+_soa_caches_lock = threading.Lock()
+
+def _get_soa_cache(nameserver):
+    """Get the shared answer cache for a nameserver"""
+    with _soa_caches_lock:
+        cache = _soa_caches.get(nameserver)
+        if cache is None:
+            cache = _soa_caches[nameserver] = dns.resolver.LRUCache(max_size=SOA_CACHE_SIZE)
+        return cache
+
+def flush_soa_cache(domain_name):
+    """
+    Drop cached SOA answers for a domain from every nameserver's cache
+    
+    Call this before re-checking a zone that was just changed.
+    
+    Args:
+        domain_name (str): The domain name to flush
+    """
+    key = (dns.name.from_text(domain_name), dns.rdatatype.SOA, dns.rdataclass.IN)
+    with _soa_caches_lock:
+        caches = list(_soa_caches.values())
+    for cache in caches:
+        cache.flush(key)
+
+# Zone file locations tried in order by get_zone_file_path
+ZONE_FILE_PATHS = ("/var/named/{}.db", "/var/named/data/{}.db")
+
+@functools.lru_cache(maxsize=4096)
+def _find_zone_file(domain):
+    """Locate a zone file; raises FileNotFoundError so misses aren't cached"""
+    for template in ZONE_FILE_PATHS:
+        path = template.format(domain)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(domain)
+
+def get_zone_file_path(domain):
+    """
+    Get the path of a domain's BIND zone file
+    
+    Found paths are remembered for the process lifetime; call
+    clear_zone_file_cache after zone files are removed or moved
+    (misses are not cached, so newly created files are found).
+    
+    Args:
+        domain (str): Domain name
+        
+    Returns:
+        str or None: Zone file path, or None if no zone file exists
+    """
+    try:
+        return _find_zone_file(domain)
+    except FileNotFoundError:
+        return None
+
+def clear_zone_file_cache():
+    """Forget the zone file paths remembered by get_zone_file_path"""
+    _find_zone_file.cache_clear()
+
+def _get_resolver(nameserver, timeout=None):
+    """
+    Get this thread's resolver for a nameserver, creating it on first use
+    
+    The resolver is configured directly, without parsing /etc/resolv.conf.
+    
+    Args:
+        nameserver (str): IP address of the nameserver to query
+        timeout (float, optional): Per-query timeout and lifetime in seconds;
+            dnspython's defaults are used if not given
+        
+    Returns:
+        dns.resolver.Resolver: Resolver querying only that nameserver
+    """
+    resolvers = getattr(_resolver_local, 'resolvers', None)
+    if resolvers is None:
+        resolvers = _resolver_local.resolvers = {}
+    
+    resolver = resolvers.get((nameserver, timeout))
+    if resolver is None:
+        resolver = dns.resolver.Resolver(configure=False)
+        resolver.nameservers = [nameserver]
+        resolver.cache = _get_soa_cache(nameserver)
+        if timeout is not None:
+            resolver.timeout = timeout
+            resolver.lifetime = timeout
+        resolvers[(nameserver, timeout)] = resolver
+    return resolver
+
 def get_bind_serial(domain_name):
     """
     Retrieve the SOA serial number from local BIND for a domain.
@@ -21,11 +130,10 @@ def get_bind_serial(domain_name):
         domain_name (str): The domain name to check
         
     Returns:
-        str: SOA serial number from BIND, or None if not found
+        int: SOA serial number from BIND, or None if not found
     """
     try:
-        resolver = dns.resolver.Resolver()
-        resolver.nameservers = ['127.0.0.1']  # Query local BIND
+        resolver = _get_resolver('127.0.0.1')  # Query local BIND
         
         # Ensure domain has a trailing dot for DNS queries
         if not domain_name.endswith('.'):
@@ -36,7 +144,7 @@ def get_bind_serial(domain_name):
         
         # Extract serial from SOA record
         for rdata in answers:
-            serial = str(rdata.serial)
+            serial = rdata.serial
             logging.debug(f"BIND SOA serial for {domain_name}: {serial}")
             return serial
         
@@ -59,7 +167,7 @@ def get_pdns_serial(domain_name):
         domain_name (str): The domain name to check
         
     Returns:
-        str: SOA serial number from PowerDNS, or None if not found
+        int: SOA serial number from PowerDNS, or None if not found
     """
     settings = get_settings()
     try:
@@ -68,17 +176,14 @@ def get_pdns_serial(domain_name):
             domain_name = domain_name + '.'
         
         # Set up resolver to query PowerDNS on MasterNS
-        resolver = dns.resolver.Resolver()
-        resolver.nameservers = [settings['masterns']]
-        resolver.timeout = 5.0  # Add timeout to prevent hanging on non-responsive servers
-        resolver.lifetime = 5.0
+        resolver = _get_resolver(settings['masterns'], 5.0)
         
         # Query for SOA record
         answers = resolver.resolve(domain_name, dns.rdatatype.SOA)
         
         # Extract serial from SOA record
         for rdata in answers:
-            serial = str(rdata.serial)
+            serial = rdata.serial
             logging.debug(f"PowerDNS SOA serial for {domain_name}: {serial}")
             return serial
         
@@ -95,28 +200,22 @@ def get_pdns_serial(domain_name):
 
 def calculate_soa_drift(bind_serial, pdns_serial):
     """
-    Calculate the absolute difference between BIND and PowerDNS serials.
+    Calculate the distance between BIND and PowerDNS serials.
+    
+    Serials are compared with RFC 1982 serial number arithmetic, so a
+    serial that wrapped past 2**32 - 1 is still close to its predecessor.
     
     Args:
-        bind_serial (str): SOA serial from BIND
-        pdns_serial (str): SOA serial from PowerDNS
+        bind_serial (int): SOA serial from BIND
+        pdns_serial (int): SOA serial from PowerDNS
         
     Returns:
-        int: Absolute difference between serials, or None if either is None
+        int: Distance between the serials, or None if either is None
     """
     if bind_serial is None or pdns_serial is None:
         return None
-    
-    try:
-        bind_serial_int = int(bind_serial)
-        pdns_serial_int = int(pdns_serial)
-        
-        drift = abs(bind_serial_int - pdns_serial_int)
-        return drift
-    
-    except ValueError as e:
-        logging.error(f"Error calculating SOA drift: {str(e)}")
-        return None
+    drift = (bind_serial - pdns_serial) & SERIAL_MASK
+    return drift if drift < SERIAL_HALF else SERIAL_MASK + 1 - drift
 
 def check_zone_sync(domain_name):
     """
@@ -133,7 +232,7 @@ def check_zone_sync(domain_name):
     
     result = {
         'domain_name': domain_name,
-        'last_check': datetime.now().isoformat(),
+        'last_check': time.time(),  # epoch seconds
         'bind_serial': None,
         'pdns_serial': None,
         'soa_drift': None,
@@ -196,8 +295,8 @@ def fix_soa_drift(domain_name, bind_serial, pdns_serial, dryrun=True):
     
     Args:
         domain_name (str): The domain name to fix
-        bind_serial (str): Current BIND serial
-        pdns_serial (str): Current PowerDNS serial
+        bind_serial (int): Current BIND serial
+        pdns_serial (int): Current PowerDNS serial
         dryrun (bool): If True, only log what would be done
         
     Returns:
@@ -208,46 +307,30 @@ def fix_soa_drift(domain_name, bind_serial, pdns_serial, dryrun=True):
         if not domain_name or not isinstance(domain_name, str):
             return False, "Invalid domain name"
         
-        if not bind_serial or not pdns_serial:
+        if bind_serial is None or pdns_serial is None:
             return False, "Missing serial numbers"
-            
-        # Determine which serial number is higher
-        try:
-            bind_serial_int = int(bind_serial)
-            pdns_serial_int = int(pdns_serial)
-        except (ValueError, TypeError):
-            return False, f"Invalid serial numbers: BIND={bind_serial}, PDNS={pdns_serial}"
         
-        # Calculate new serial - should be one higher than the highest current serial
-        new_serial = max(bind_serial_int, pdns_serial_int) + 1
+        # One past whichever serial is ahead in serial number arithmetic
+        if (bind_serial - pdns_serial) & SERIAL_MASK < SERIAL_HALF:
+            newest_serial = bind_serial
+        else:
+            newest_serial = pdns_serial
+        new_serial = (newest_serial + 1) & SERIAL_MASK
         new_serial_str = str(new_serial)
         
-        # Get zone file path
-        zone_file_path = f"/var/named/{domain_name}.db"
-        if not os.path.exists(zone_file_path):
-            zone_file_path = f"/var/named/data/{domain_name}.db"
-            if not os.path.exists(zone_file_path):
-                return False, f"Zone file for {domain_name} not found"
-        
-        # Use dig to retrieve SOA parameters
-        cmd = f"dig @127.0.0.1 {domain_name} SOA +short"
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        
-        if result.returncode != 0 or not result.stdout.strip():
-            return False, f"Failed to retrieve SOA record: {result.stderr}"
+        if get_zone_file_path(domain_name) is None:
+            return False, f"Zone file for {domain_name} not found"
         
-        # Parse SOA record (format: ns1.example.com. hostmaster.example.com. 2023030101 86400 7200 3600000 86400)
-        soa_parts = result.stdout.strip().split()
-        if len(soa_parts) < 7:
-            return False, f"Invalid SOA record format: {result.stdout}"
+        # Retrieve SOA parameters from local BIND
+        qname = domain_name if domain_name.endswith('.') else domain_name + '.'
+        try:
+            answers = _get_resolver('127.0.0.1').resolve(qname, dns.rdatatype.SOA)
+        except dns.exception.DNSException as e:
+            return False, f"Failed to retrieve SOA record: {e}"
+        soa = answers[0]
         
-        # Update serial number in SOA record
-        primary_ns = soa_parts[0]
-        email = soa_parts[1]
-        refresh = soa_parts[3]
-        retry = soa_parts[4]
-        expire = soa_parts[5]
-        minimum = soa_parts[6]
+        primary_ns = soa.mname.to_text()
+        email = soa.rname.to_text()
         
         # Use recommended TTL values
         refresh = "86400"   # 24 hours 
@@ -261,18 +344,22 @@ def fix_soa_drift(domain_name, bind_serial, pdns_serial, dryrun=True):
             return True, f"Would update SOA serial from {bind_serial} to {new_serial_str}"
         
         # Use whmapi1 to update the SOA record
-        cmd = f"whmapi1 edit_zone_record domain={domain_name} " \
-              f"class=IN type=SOA " \
-              f"line=\"{domain_name}. 86400 IN SOA {primary_ns} {email} {new_serial_str} {refresh} {retry} {expire} {minimum}\""
-        
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        # Passed as one argument, so the record line needs no shell quoting
+        result = subprocess.run(
+            ['whmapi1', 'edit_zone_record', f"domain={domain_name}",
+             'class=IN', 'type=SOA',
+             f"line={domain_name}. 86400 IN SOA {primary_ns} {email} {new_serial_str} {refresh} {retry} {expire} {minimum}"],
+            capture_output=True, text=True
+        )
         
         if result.returncode != 0:
             return False, f"Failed to update SOA record: {result.stderr}"
         
         # Force BIND to reload the zone
-        cmd = f"whmapi1 reloadzones domains={domain_name}"
-        subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        subprocess.run(
+            ['whmapi1', 'reloadzones', f"domains={domain_name}"],
+            capture_output=True, text=True
+        )
         
         logging.info(f"Updated SOA serial for {domain_name} from {bind_serial} to {new_serial_str}")
         return True, f"Updated SOA serial from {bind_serial} to {new_serial_str}"
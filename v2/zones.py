@@ -6,17 +6,148 @@
 # Version: 3.3
 
 import os
+import time
+import asyncio
 import logging
+import functools
+import threading
 import subprocess
 from datetime import datetime
 
+import dns.name
+import dns.rdataclass
+import dns.rdatatype
 import dns.resolver
+import dns.asyncresolver
 import dns.zone
 import dns.exception
 
 from .config import get_settings
 from .delegation import check_authoritative_ns
 
+# SOA serials are unsigned 32-bit numbers compared per RFC 1982
+SERIAL_MASK = 0xFFFFFFFF
+SERIAL_HALF = 0x80000000
+
+# Resolvers are cached per thread and nameserver (see _get_resolver);
+# check_zone_sync may run on several threads at once
+_resolver_local = threading.local()
+
+# Answer caches shared by all threads' resolvers, one per nameserver since
+# dnspython cache keys don't include the server. Entries expire with the
+# record TTL; see flush_soa_cache for forcing a fresh lookup.
+SOA_CACHE_SIZE = 10000
+_soa_caches = {}
+_soa_caches_lock = threading.Lock()
+
+# Async resolvers used by check_zones_sync, keyed by (nameserver, timeout).
+# They aren't tied to an event loop, so each batch reuses them; they share
+# the answer caches above with the threaded resolvers.
+_async_resolvers = {}
+
+# Upper bound on SOA lookups in flight at once in check_zones_sync
+ASYNC_CONCURRENCY = 64
+
+def _get_soa_cache(nameserver):
+    """Get the shared answer cache for a nameserver"""
+    with _soa_caches_lock:
+        cache = _soa_caches.get(nameserver)
+        if cache is None:
+            cache = _soa_caches[nameserver] = dns.resolver.LRUCache(max_size=SOA_CACHE_SIZE)
+        return cache
+
+def flush_soa_cache(domain_name):
+    """
+    Drop cached SOA answers for a domain from every nameserver's cache
+    
+    Call this before re-checking a zone that was just changed.
+    
+    Args:
+        domain_name (str): The domain name to flush
+    """
+    key = (dns.name.from_text(domain_name), dns.rdatatype.SOA, dns.rdataclass.IN)
+    with _soa_caches_lock:
+        caches = list(_soa_caches.values())
+    for cache in caches:
+        cache.flush(key)
+
+# Zone file locations tried in order by get_zone_file_path
+ZONE_FILE_PATHS = ("/var/named/{}.db", "/var/named/data/{}.db")
+
+@functools.lru_cache(maxsize=4096)
+def _find_zone_file(domain):
+    """Locate a zone file; raises FileNotFoundError so misses aren't cached"""
+    for template in ZONE_FILE_PATHS:
+        path = template.format(domain)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(domain)
+
+def get_zone_file_path(domain):
+    """
+    Get the path of a domain's BIND zone file
+    
+    Found paths are remembered for the process lifetime; call
+    clear_zone_file_cache after zone files are removed or moved
+    (misses are not cached, so newly created files are found).
+    
+    Args:
+        domain (str): Domain name
+        
+    Returns:
+        str or None: Zone file path, or None if no zone file exists
+    """
+    try:
+        return _find_zone_file(domain)
+    except FileNotFoundError:
+        return None
+
+def clear_zone_file_cache():
+    """Forget the zone file paths remembered by get_zone_file_path"""
+    _find_zone_file.cache_clear()
+
+def _get_resolver(nameserver, timeout=None):
+    """
+    Get this thread's resolver for a nameserver, creating it on first use
+    
+    The resolver is configured directly, without parsing /etc/resolv.conf.
+    
+    Args:
+        nameserver (str): IP address of the nameserver to query
+        timeout (float, optional): Per-query timeout and lifetime in seconds;
+            dnspython's defaults are used if not given
+        
+    Returns:
+        dns.resolver.Resolver: Resolver querying only that nameserver
+    """
+    resolvers = getattr(_resolver_local, 'resolvers', None)
+    if resolvers is None:
+        resolvers = _resolver_local.resolvers = {}
+    
+    resolver = resolvers.get((nameserver, timeout))
+    if resolver is None:
+        resolver = dns.resolver.Resolver(configure=False)
+        resolver.nameservers = [nameserver]
+        resolver.cache = _get_soa_cache(nameserver)
+        if timeout is not None:
+            resolver.timeout = timeout
+            resolver.lifetime = timeout
+        resolvers[(nameserver, timeout)] = resolver
+    return resolver
+
+def _get_async_resolver(nameserver, timeout=None):
+    """Get the shared async resolver for a nameserver; see _get_resolver"""
+    resolver = _async_resolvers.get((nameserver, timeout))
+    if resolver is None:
+        resolver = dns.asyncresolver.Resolver(configure=False)
+        resolver.nameservers = [nameserver]
+        resolver.cache = _get_soa_cache(nameserver)
+        if timeout is not None:
+            resolver.timeout = timeout
+            resolver.lifetime = timeout
+        _async_resolvers[(nameserver, timeout)] = resolver
+    return resolver
+
 def validate_zone_file(domain):
     """
     Validate the integrity of a DNS zone file for a given domain.
@@ -27,10 +158,7 @@ def validate_zone_file(domain):
     Returns:
         dict: Validation results with status and potential errors
     """
-    zone_file_paths = [
-        f"/var/named/{domain}.db",
-        f"/var/named/data/{domain}.db"
-    ]
+    zone_file_paths = [template.format(domain) for template in ZONE_FILE_PATHS]
     
     result = {
         'valid': False,
@@ -41,9 +169,11 @@ def validate_zone_file(domain):
     for path in zone_file_paths:
         if os.path.exists(path):
             result['path'] = path
-            cmd = f"named-checkzone {domain} {path}"
             try:
-                zone_check = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+                zone_check = subprocess.run(
+                    ['named-checkzone', domain, path],
+                    capture_output=True, text=True
+                )
                 if zone_check.returncode == 0:
                     result['valid'] = True
                     break
@@ -68,8 +198,10 @@ def reload_zone(domain):
         tuple: (success: bool, message: str)
     """
     try:
-        cmd = f"whmapi1 reloadzones domains={domain}"
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        result = subprocess.run(
+            ['whmapi1', 'reloadzones', f"domains={domain}"],
+            capture_output=True, text=True
+        )
         if result.returncode != 0:
             logging.error(f"Failed to reload zone {domain}: {result.stderr}")
             return False, f"Failed to reload zone {domain}: {result.stderr}"
@@ -98,17 +230,7 @@ def backup_zone_file(domain):
         'error': None
     }
     
-    zone_file_paths = [
-        f"/var/named/{domain}.db",
-        f"/var/named/data/{domain}.db"
-    ]
-    
-    source_path = None
-    for path in zone_file_paths:
-        if os.path.exists(path):
-            source_path = path
-            break
-    
+    source_path = get_zone_file_path(domain)
     if not source_path:
         backup_result['error'] = "Zone file not found"
         return backup_result
@@ -139,16 +261,15 @@ def get_bind_serial(domain_name):
         domain_name (str): The domain name to check
         
     Returns:
-        str: SOA serial number from BIND, or None if not found
+        int: SOA serial number from BIND, or None if not found
     """
     try:
-        resolver = dns.resolver.Resolver()
-        resolver.nameservers = ['127.0.0.1']
+        resolver = _get_resolver('127.0.0.1')  # Query local BIND
         if not domain_name.endswith('.'):
             domain_name += '.'
         answers = resolver.resolve(domain_name, dns.rdatatype.SOA)
         for rdata in answers:
-            serial = str(rdata.serial)
+            serial = rdata.serial
             logging.debug(f"BIND SOA serial for {domain_name}: {serial}")
             return serial
         logging.warning(f"No SOA record found in BIND for {domain_name}")
@@ -168,19 +289,16 @@ def get_pdns_serial(domain_name):
         domain_name (str): The domain name to check
         
     Returns:
-        str: SOA serial number from PowerDNS, or None if not found
+        int: SOA serial number from PowerDNS, or None if not found
     """
     settings = get_settings()
     try:
         if not domain_name.endswith('.'):
             domain_name += '.'
-        resolver = dns.resolver.Resolver()
-        resolver.nameservers = [settings['masterns']]
-        resolver.timeout = 5.0
-        resolver.lifetime = 5.0
+        resolver = _get_resolver(settings['masterns'], 5.0)
         answers = resolver.resolve(domain_name, dns.rdatatype.SOA)
         for rdata in answers:
-            serial = str(rdata.serial)
+            serial = rdata.serial
             logging.debug(f"PowerDNS SOA serial for {domain_name}: {serial}")
             return serial
         logging.warning(f"No SOA record found in PowerDNS for {domain_name}")
@@ -194,40 +312,28 @@ def get_pdns_serial(domain_name):
 
 def calculate_soa_drift(bind_serial, pdns_serial):
     """
-    Calculate the absolute difference between BIND and PowerDNS serials.
+    Calculate the distance between BIND and PowerDNS serials.
+    
+    Serials are compared with RFC 1982 serial number arithmetic, so a
+    serial that wrapped past 2**32 - 1 is still close to its predecessor.
     
     Args:
-        bind_serial (str): SOA serial from BIND
-        pdns_serial (str): SOA serial from PowerDNS
+        bind_serial (int): SOA serial from BIND
+        pdns_serial (int): SOA serial from PowerDNS
         
     Returns:
-        int: Absolute difference between serials, or None if either is None
+        int: Distance between the serials, or None if either is None
     """
     if bind_serial is None or pdns_serial is None:
         return None
-    try:
-        bind_serial_int = int(bind_serial)
-        pdns_serial_int = int(pdns_serial)
-        drift = abs(bind_serial_int - pdns_serial_int)
-        return drift
-    except ValueError as e:
-        logging.error(f"Error calculating SOA drift: {str(e)}")
-        return None
+    drift = (bind_serial - pdns_serial) & SERIAL_MASK
+    return drift if drift < SERIAL_HALF else SERIAL_MASK + 1 - drift
 
-def check_zone_sync(domain_name):
-    """
-    Check synchronization status for a specific domain.
-    
-    Args:
-        domain_name (str): The domain name to check
-        
-    Returns:
-        dict: Status information including bind_serial, pdns_serial, sync_status, and soa_drift
-    """
-    settings = get_settings()
-    result = {
+def _new_sync_result(domain_name):
+    """Create the result dict returned by check_zone_sync"""
+    return {
         'domain_name': domain_name,
-        'last_check': datetime.now().isoformat(),
+        'last_check': time.time(),  # epoch seconds
         'bind_serial': None,
         'pdns_serial': None,
         'soa_drift': None,
@@ -236,32 +342,34 @@ def check_zone_sync(domain_name):
         'event_type': 'check',
         'details': f"Checking synchronization status for {domain_name}"
     }
+
+def _set_sync_error(result, message):
+    """Mark a sync result as failed"""
+    result['sync_status'] = 'error'
+    result['error_message'] = message
+    result['details'] = message
+    return result
+
+def _finish_sync_result(result, bind_serial, pdns_serial, max_soa_drift):
+    """
+    Fill in a sync result from the two serials
     
-    bind_serial = get_bind_serial(domain_name)
+    A missing PowerDNS serial is only reported if the BIND serial was found.
+    """
+    domain_name = result['domain_name']
     result['bind_serial'] = bind_serial
     if bind_serial is None:
-        result['sync_status'] = 'error'
-        result['error_message'] = f"Failed to get BIND SOA serial for {domain_name}"
-        result['details'] = result['error_message']
-        return result
+        return _set_sync_error(result, f"Failed to get BIND SOA serial for {domain_name}")
     
-    pdns_serial = get_pdns_serial(domain_name)
     result['pdns_serial'] = pdns_serial
     if pdns_serial is None:
-        result['sync_status'] = 'error'
-        result['error_message'] = f"Failed to get PowerDNS SOA serial for {domain_name}"
-        result['details'] = result['error_message']
-        return result
+        return _set_sync_error(result, f"Failed to get PowerDNS SOA serial for {domain_name}")
     
     soa_drift = calculate_soa_drift(bind_serial, pdns_serial)
     result['soa_drift'] = soa_drift
     if soa_drift is None:
-        result['sync_status'] = 'error'
-        result['error_message'] = "Failed to calculate SOA drift"
-        result['details'] = result['error_message']
-        return result
+        return _set_sync_error(result, "Failed to calculate SOA drift")
     
-    max_soa_drift = settings['max_soa_drift']
     if soa_drift == 0:
         result['sync_status'] = 'success'
         result['details'] = f"Zone is in sync: BIND SOA {bind_serial}, PowerDNS SOA {pdns_serial}"
@@ -276,14 +384,94 @@ def check_zone_sync(domain_name):
     
     return result
 
+def check_zone_sync(domain_name):
+    """
+    Check synchronization status for a specific domain.
+    
+    Args:
+        domain_name (str): The domain name to check
+        
+    Returns:
+        dict: Status information including bind_serial, pdns_serial, sync_status, and soa_drift
+    """
+    settings = get_settings()
+    result = _new_sync_result(domain_name)
+    
+    bind_serial = get_bind_serial(domain_name)
+    if bind_serial is None:
+        return _finish_sync_result(result, None, None, settings['max_soa_drift'])
+    
+    pdns_serial = get_pdns_serial(domain_name)
+    return _finish_sync_result(result, bind_serial, pdns_serial, settings['max_soa_drift'])
+
+async def _get_serial_async(resolver, domain_name, source):
+    """Async counterpart of get_bind_serial/get_pdns_serial; source names the server in logs"""
+    try:
+        if not domain_name.endswith('.'):
+            domain_name += '.'
+        answers = await resolver.resolve(domain_name, dns.rdatatype.SOA)
+        for rdata in answers:
+            serial = rdata.serial
+            logging.debug(f"{source} SOA serial for {domain_name}: {serial}")
+            return serial
+        logging.warning(f"No SOA record found in {source} for {domain_name}")
+        return None
+    except dns.exception.DNSException as e:
+        logging.error(f"Error getting {source} SOA for {domain_name}: {str(e)}")
+        return None
+    except Exception as e:
+        logging.error(f"Unexpected error getting {source} SOA for {domain_name}: {str(e)}")
+        return None
+
+async def _check_zone_sync_async(domain_name, bind_resolver, pdns_resolver, semaphore, max_soa_drift):
+    """Check one domain, querying BIND and PowerDNS concurrently"""
+    async with semaphore:
+        result = _new_sync_result(domain_name)
+        bind_serial, pdns_serial = await asyncio.gather(
+            _get_serial_async(bind_resolver, domain_name, 'BIND'),
+            _get_serial_async(pdns_resolver, domain_name, 'PowerDNS')
+        )
+    return _finish_sync_result(result, bind_serial, pdns_serial, max_soa_drift)
+
+async def _check_zones_async(domain_names, concurrency):
+    """Run _check_zone_sync_async for every domain under one semaphore"""
+    settings = get_settings()
+    bind_resolver = _get_async_resolver('127.0.0.1')
+    pdns_resolver = _get_async_resolver(settings['masterns'], 5.0)
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*[
+        _check_zone_sync_async(domain_name, bind_resolver, pdns_resolver,
+                               semaphore, settings['max_soa_drift'])
+        for domain_name in domain_names
+    ])
+
+def check_zones_sync(domain_names, concurrency=ASYNC_CONCURRENCY):
+    """
+    Check synchronization status for several domains at once
+    
+    All SOA lookups are multiplexed on an asyncio event loop in the
+    calling thread, at most `concurrency` domains at a time. Must not be
+    called from a running event loop.
+    
+    Args:
+        domain_names (list): Domain names to check
+        concurrency (int): Maximum number of domains checked concurrently
+        
+    Returns:
+        list: check_zone_sync results, in the order of domain_names
+    """
+    if not domain_names:
+        return []
+    return asyncio.run(_check_zones_async(domain_names, concurrency))
+
 def fix_soa_drift(domain_name, bind_serial, pdns_serial, dryrun=True):
     """
     Attempt to fix SOA drift by updating the SOA record.
     
     Args:
         domain_name (str): The domain name to fix
-        bind_serial (str): Current BIND serial
-        pdns_serial (str): Current PowerDNS serial
+        bind_serial (int): Current BIND serial
+        pdns_serial (int): Current PowerDNS serial
         dryrun (bool): If True, only log what would be done
         
     Returns:
@@ -292,34 +480,30 @@ def fix_soa_drift(domain_name, bind_serial, pdns_serial, dryrun=True):
     try:
         if not domain_name or not isinstance(domain_name, str):
             return False, "Invalid domain name"
-        if not bind_serial or not pdns_serial:
+        if bind_serial is None or pdns_serial is None:
             return False, "Missing serial numbers"
-        try:
-            bind_serial_int = int(bind_serial)
-            pdns_serial_int = int(pdns_serial)
-        except (ValueError, TypeError):
-            return False, f"Invalid serial numbers: BIND={bind_serial}, PDNS={pdns_serial}"
         
-        new_serial = max(bind_serial_int, pdns_serial_int) + 1
+        # One past whichever serial is ahead in serial number arithmetic
+        if (bind_serial - pdns_serial) & SERIAL_MASK < SERIAL_HALF:
+            newest_serial = bind_serial
+        else:
+            newest_serial = pdns_serial
+        new_serial = (newest_serial + 1) & SERIAL_MASK
         new_serial_str = str(new_serial)
         
-        zone_file_path = f"/var/named/{domain_name}.db"
-        if not os.path.exists(zone_file_path):
-            zone_file_path = f"/var/named/data/{domain_name}.db"
-            if not os.path.exists(zone_file_path):
-                return False, f"Zone file for {domain_name} not found"
-        
-        cmd = f"dig @127.0.0.1 {domain_name} SOA +short"
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        if result.returncode != 0 or not result.stdout.strip():
-            return False, f"Failed to retrieve SOA record: {result.stderr}"
+        if get_zone_file_path(domain_name) is None:
+            return False, f"Zone file for {domain_name} not found"
         
-        soa_parts = result.stdout.strip().split()
-        if len(soa_parts) < 7:
-            return False, f"Invalid SOA record format: {result.stdout}"
+        # Read the current SOA from local BIND
+        qname = domain_name if domain_name.endswith('.') else domain_name + '.'
+        try:
+            answers = _get_resolver('127.0.0.1').resolve(qname, dns.rdatatype.SOA)
+        except dns.exception.DNSException as e:
+            return False, f"Failed to retrieve SOA record: {e}"
+        soa = answers[0]
         
-        primary_ns = soa_parts[0]
-        email = soa_parts[1]
+        primary_ns = soa.mname.to_text()
+        email = soa.rname.to_text()
         refresh = "86400"   # 24 hours
         retry = "7200"      # 2 hours
         expire = "3600000"  # ~41.7 days
@@ -330,15 +514,20 @@ def fix_soa_drift(domain_name, bind_serial, pdns_serial, dryrun=True):
             logging.info(f"[Dry-run] New SOA record: {domain_name}. 86400 IN SOA {primary_ns} {email} {new_serial_str} {refresh} {retry} {expire} {minimum}")
             return True, f"Would update SOA serial from {bind_serial} to {new_serial_str}"
         
-        cmd = f"whmapi1 edit_zone_record domain={domain_name} " \
-              f"class=IN type=SOA " \
-              f"line=\"{domain_name}. 86400 IN SOA {primary_ns} {email} {new_serial_str} {refresh} {retry} {expire} {minimum}\""
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        # Passed as one argument, so the record line needs no shell quoting
+        result = subprocess.run(
+            ['whmapi1', 'edit_zone_record', f"domain={domain_name}",
+             'class=IN', 'type=SOA',
+             f"line={domain_name}. 86400 IN SOA {primary_ns} {email} {new_serial_str} {refresh} {retry} {expire} {minimum}"],
+            capture_output=True, text=True
+        )
         if result.returncode != 0:
             return False, f"Failed to update SOA record: {result.stderr}"
         
-        cmd = f"whmapi1 reloadzones domains={domain_name}"
-        subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        subprocess.run(
+            ['whmapi1', 'reloadzones', f"domains={domain_name}"],
+            capture_output=True, text=True
+        )
         
         logging.info(f"Updated SOA serial for {domain_name} from {bind_serial} to {new_serial_str}")
         return True, f"Updated SOA serial from {bind_serial} to {new_serial_str}"